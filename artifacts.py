@@ -0,0 +1,131 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def default_spill_dir():
+    # tmpfs where there is one, so spilled blobs still never hit a disk
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+class ArtifactStore:
+    """Named blobs (pack members, encoded textures, FBX files) kept in memory.
+
+    Once more than max_bytes (None = no limit) are held, the least recently
+    used blobs are moved to files in a private folder under spill_dir and
+    read back from there on access. clear() drops everything, spilled files
+    included.
+    """
+
+    def __init__(self, max_bytes=None, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else default_spill_dir()
+        self._blobs = OrderedDict()
+        self._spilled = {}
+        self._folder = None
+        self._lock = threading.Lock()
+        self.bytes_in_memory = 0
+        self.peak_bytes = 0
+        self.spills = 0
+        self.spilled_bytes = 0
+
+    def _spill_path(self, name):
+        if self._folder is None:
+            self._folder = Path(tempfile.mkdtemp(prefix="autopack-", dir=self.spill_dir))
+        return self._folder / name
+
+    def _spill(self, name, data):
+        path = self._spill_path(name)
+        path.write_bytes(data)
+        self._spilled[name] = path
+        self.spills += 1
+        self.spilled_bytes += len(data)
+
+    def _drop(self, name):
+        data = self._blobs.pop(name, None)
+        if data is not None:
+            self.bytes_in_memory -= len(data)
+        path = self._spilled.pop(name, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def put(self, name, data):
+        data = bytes(data)
+        with self._lock:
+            self._drop(name)
+            if self.max_bytes is not None and len(data) > self.max_bytes:
+                self._spill(name, data)
+                return name
+            self._blobs[name] = data
+            self.bytes_in_memory += len(data)
+            while self.max_bytes is not None and self.bytes_in_memory > self.max_bytes:
+                old, old_data = self._blobs.popitem(last=False)
+                self.bytes_in_memory -= len(old_data)
+                self._spill(old, old_data)
+            self.peak_bytes = max(self.peak_bytes, self.bytes_in_memory)
+        return name
+
+    def get(self, name):
+        with self._lock:
+            data = self._blobs.get(name)
+            if data is not None:
+                self._blobs.move_to_end(name)
+                return data
+            # read while holding the lock: put() or clear() could drop the file
+            path = self._spilled.get(name)
+            return path.read_bytes() if path is not None else None
+
+    def open(self, name):
+        data = self.get(name)
+        return io.BytesIO(data) if data is not None else None
+
+    def path(self, name):
+        """Return a file holding the blob, spilling it if it is in memory, for
+        consumers that only take paths."""
+        with self._lock:
+            if name in self._spilled:
+                return self._spilled[name]
+            data = self._blobs.pop(name, None)
+            if data is None:
+                return None
+            self.bytes_in_memory -= len(data)
+            self._spill(name, data)
+            return self._spilled[name]
+
+    def delete(self, name):
+        with self._lock:
+            self._drop(name)
+
+    def names(self):
+        with self._lock:
+            return list(self._blobs) + list(self._spilled)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._blobs or name in self._spilled
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._blobs) + len(self._spilled),
+                "bytes_in_memory": self.bytes_in_memory,
+                "peak_bytes": self.peak_bytes,
+                "spills": self.spills,
+                "spilled_bytes": self.spilled_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._blobs.clear()
+            self._spilled.clear()
+            self.bytes_in_memory = 0
+            folder, self._folder = self._folder, None
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,156 @@
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    digest TEXT NOT NULL,
+    asset_type TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (digest, asset_type, owner)
+)
+"""
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetCache:
+    """Persistent map of (content hash, asset type, creator) -> Roblox asset id.
+
+    Backed by SQLite in WAL mode, so several processes can read and write the
+    same file; every thread gets its own connection. Entries older than
+    max_age seconds (None = forever) count as misses and are dropped by
+    expire().
+    """
+
+    def __init__(self, path, owner="", max_age=None):
+        self.path = Path(path)
+        self.owner = str(owner)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # every thread's connection, so close() can reach them all
+        self._conns = []
+        with self._conn() as conn:
+            conn.execute(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._conns:
+            # closed from another thread by close(): still only used by this one
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, digest, asset_type):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT asset_id, created FROM assets WHERE digest=? AND asset_type=? AND owner=?",
+            (digest, asset_type, self.owner),
+        ).fetchone()
+        if row is None or (self.max_age is not None and now - row[1] > self.max_age):
+            self._count(False)
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE assets SET last_used=? WHERE digest=? AND asset_type=? AND owner=?",
+                (now, digest, asset_type, self.owner),
+            )
+        self._count(True)
+        return row[0]
+
+    def put(self, digest, asset_type, asset_id):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO assets (digest, asset_type, owner, asset_id, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, asset_type, self.owner, str(asset_id), now, now),
+            )
+
+    def invalidate(self, digest=None, asset_type=None):
+        # no arguments clears everything for this owner
+        query = "DELETE FROM assets WHERE owner=?"
+        args = [self.owner]
+        if digest is not None:
+            query += " AND digest=?"
+            args.append(digest)
+        if asset_type is not None:
+            query += " AND asset_type=?"
+            args.append(asset_type)
+        with self._conn() as conn:
+            return conn.execute(query, args).rowcount
+
+    def expire(self, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        if max_age is None:
+            return 0
+        with self._conn() as conn:
+            return conn.execute(
+                "DELETE FROM assets WHERE owner=? AND created < ?", (self.owner, time.time() - max_age)
+            ).rowcount
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM assets WHERE owner=?", (self.owner,)).fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0, "entries": self.size()}
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the uploaded asset cache")
+    parser.add_argument("path", help="cache database file")
+    parser.add_argument("--owner", default="", help="creator user id the entries belong to")
+    parser.add_argument("--clear", action="store_true", help="drop every entry for the owner")
+    parser.add_argument("--expire-days", type=float, help="drop entries older than this many days")
+    args = parser.parse_args()
+
+    cache = AssetCache(args.path, owner=args.owner)
+    if args.clear:
+        print(f"[OK] Removed {cache.invalidate()} entries")
+    if args.expire_days is not None:
+        print(f"[OK] Expired {cache.expire(args.expire_days * 86400)} entries")
+    print(f"{cache.size()} cached assets for owner {args.owner!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from converter import TRACE_FILE, TRACE_PROFILE, Converter
+
+PACK_SUFFIXES = (".zip", ".mcpack")
+
+
+def collect_packs(paths):
+    packs = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            packs.extend(sorted(f for f in p.iterdir() if f.suffix.lower() in PACK_SUFFIXES))
+        elif p.suffix.lower() in PACK_SUFFIXES and p.exists():
+            packs.append(p)
+        else:
+            print(f"[WARN] Skipping {p}: not a .zip/.mcpack file or folder")
+    # the same file given twice (e.g. itself and its folder) is converted once
+    return list({p.resolve(): p for p in packs}.values())
+
+
+def output_names(packs):
+    """Folder name in --out for every pack: its stem, plus a short hash of
+    its full path when packs from different folders share a stem."""
+    stems = [p.stem for p in packs]
+    names = {}
+    for pack, stem in zip(packs, stems):
+        if stems.count(stem) > 1:
+            stem += "-" + hashlib.sha1(str(pack.resolve()).encode()).hexdigest()[:8]
+        names[pack] = stem
+    return names
+
+
+def write_outputs(out_dir, result):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "generated_items.json").write_text(json.dumps(result["items"], indent=4))
+    (out_dir / "compressed.txt").write_text(result["compressed"] + "\n")
+    (out_dir / "clay.json").write_text(json.dumps(result["clay"], indent=4))
+
+
+def print_summary(rows, wall):
+    stages = ("extract", "resize", "mesh", "upload", "total")
+    print()
+    print(f"{'pack':<32}" + "".join(f"{s:>9}" for s in stages) + f"{'reqs':>7}  status")
+    totals = dict.fromkeys(stages, 0.0)
+    requests = 0
+    for name, result, error in rows:
+        if error:
+            print(f"{name[:31]:<32}" + " " * (9 * len(stages) + 7) + f"  FAILED: {error}")
+            continue
+        t = result["timings"]
+        for s in stages:
+            totals[s] += t[s]
+        requests += result["requests"]
+        print(f"{name[:31]:<32}" + "".join(f"{t[s]:>8.2f}s" for s in stages) + f"{result['requests']:>7}  ok")
+    ok = sum(1 for _, _, e in rows if not e)
+    print(f"{'all packs':<32}" + "".join(f"{totals[s]:>8.2f}s" for s in stages) + f"{requests:>7}")
+    print(f"{ok}/{len(rows)} packs converted in {wall:.2f}s wall time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert many texture packs without any prompts")
+    parser.add_argument("packs", nargs="+", help=".zip/.mcpack files or folders containing them")
+    parser.add_argument("-o", "--out", default="output", help="folder for the per-pack results")
+    parser.add_argument("--clay-dir", help="folder with clay textures for packs that have none")
+    parser.add_argument("--trace", default=TRACE_FILE, help="write a Chrome trace of the run to this file")
+    parser.add_argument("--profile", default=TRACE_PROFILE, metavar="SPAN",
+                        help="run every span with this name (e.g. createMesh) under cProfile")
+    args = parser.parse_args()
+
+    packs = collect_packs(args.packs)
+    if not packs:
+        raise SystemExit("No packs to convert")
+
+    out_root = Path(args.out)
+    names = output_names(packs)
+    rows = []
+    t0 = time.time()
+    converter = Converter(trace_file=args.trace, profile=args.profile)
+    try:
+        for pack in packs:
+            print(f"=== {pack}")
+            try:
+                result = converter.convert(pack, clay_folder=args.clay_dir)
+            except Exception as e:
+                print(f"[ERROR] {pack.name} failed: {e!r}")
+                converter.cleanup()
+                rows.append((pack.name, None, repr(e)))
+                continue
+            write_outputs(out_root / names[pack], result)
+            print(result["compressed"])
+            rows.append((pack.name, result, None))
+    finally:
+        converter.close()
+
+    print_summary(rows, time.time() - t0)
+
+
+if __name__ == "__main__":
+    main()
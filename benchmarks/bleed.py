@@ -0,0 +1,41 @@
+"""Compare bleed.edge_expand against the original per-pixel BFS.
+
+Run from the repo root:  python -m benchmarks.bleed
+"""
+import sys
+import time
+
+import numpy as np
+from bleed import edge_expand, edge_expand_reference
+from benchmarks.textures import make_texture
+
+RESOLUTIONS = (16, 32, 64, 128, 256, 512)
+CASES = (
+    {"max_dist": 48, "opacity_threshold": 0, "force_opaque": False},
+    {"max_dist": 8, "opacity_threshold": 127, "force_opaque": True},
+)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    failed = False
+    print(f"{'res':>5} {'case':>4} {'reference':>10} {'numpy':>10} {'speedup':>8}  match")
+    for res in RESOLUTIONS:
+        img = make_texture(res, seed=res)
+        for ci, case in enumerate(CASES):
+            ref, t_ref = timed(edge_expand_reference, img, **case)
+            new, t_new = timed(edge_expand, img, **case)
+            same = np.array_equal(np.asarray(ref), np.asarray(new))
+            failed |= not same
+            print(f"{res:>5} {ci:>4} {t_ref:>9.3f}s {t_new:>9.3f}s {t_ref / t_new:>7.1f}x  {'ok' if same else 'MISMATCH'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
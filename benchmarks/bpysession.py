@@ -0,0 +1,61 @@
+"""Time and memory per mesh over a long run of the bpy backend.
+
+Builds the same Mesh for hundreds of items and prints, per window of
+meshes, the mean time per mesh, the process RSS and how many meshes,
+materials, images and objects bpy.data holds. All of them should stay flat.
+
+Run from the repo root:  python -m benchmarks.bpysession [items] [res] [window]
+"""
+import contextlib
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+from functools import partial
+
+from benchmarks.textures import make_texture
+from mesh import Mesh, load_bpy
+from meshfarm import find_in_folder
+
+bpy = load_bpy()
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # peak instead of current where /proc is missing (macOS reports bytes)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def main():
+    if bpy is None:
+        print("[ERROR] bpy is not installed, nothing to measure")
+        sys.exit(1)
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    res = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(window):
+            make_texture(res, seed=i).save(os.path.join(tmp, f"tex{i}.png"))
+        generator = Mesh(tmp, tmp, partial(find_in_folder, tmp), backend="bpy")
+        print(f"{'items':>6} {'ms/mesh':>8} {'rss MB':>8} {'meshes':>7} {'materials':>9} {'images':>7} {'objects':>7}")
+        t0 = time.perf_counter()
+        for i in range(items):
+            # names repeat every window, like re-running the same pack
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.createMesh(f"tex{i % window}")
+            if (i + 1) % window == 0:
+                dt = time.perf_counter() - t0
+                print(f"{i + 1:>6} {dt / window * 1000:>8.1f} {rss_mb():>8.1f} {len(bpy.data.meshes):>7} "
+                      f"{len(bpy.data.materials):>9} {len(bpy.data.images):>7} {len(bpy.data.objects):>7}")
+                t0 = time.perf_counter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measured peak memory of resize and mesh jobs against memory.JOB_COSTS.
+
+Every job runs alone in a fresh worker process, so its peak RSS growth is
+not blurred by other jobs or by memory freed earlier. Use the output to
+refit JOB_COSTS when a stage changes how it holds its data.
+
+Run from the repo root:  python -m benchmarks.memory [backend]
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+import memory
+from benchmarks.textures import make_texture
+
+RESOLUTIONS = (16, 32, 64, 128, 256, 512)
+
+
+def find_in(folder, filename):
+    path = os.path.join(folder, filename)
+    return path if os.path.exists(path) else None
+
+
+def job(kind, folder, name):
+    # imports and set-up happen before the measurement starts
+    from imaging import resize_png
+    from mesh import Mesh
+    generator = None
+    if kind.startswith("mesh_"):
+        _, backend, mode = kind.split("_")
+        generator = Mesh(folder, folder, partial(find_in, folder), mesh_mode=mode, backend=backend)
+    src = os.path.join(folder, f"{name}.png")
+    memory.reset_peak()
+    before = memory.rss()
+    if generator:
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.createMesh(name)
+    else:
+        resize_png(src, bleed=kind == "resize_bleed")
+    return memory.peak() - before
+
+
+def main():
+    if not memory.reset_peak():
+        raise SystemExit("[ERROR] Peak memory can only be measured where /proc/self/clear_refs exists (Linux)")
+    backend = sys.argv[1] if len(sys.argv) > 1 else "native"
+    kinds = ["resize", "resize_bleed", f"mesh_{backend}_pixel", f"mesh_{backend}_merged"]
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'kind':>20} {'res':>5} {'opaque':>7} {'estimate MB':>11} {'peak MB':>8} {'ratio':>6}")
+        for res in RESOLUTIONS:
+            img = make_texture(res, seed=res)
+            img.save(os.path.join(tmp, f"t{res}.png"))
+            opaque = int((np.asarray(img.getchannel("A")) > 0).sum())
+            for kind in kinds:
+                with ProcessPoolExecutor(1, mp_context=ctx, max_tasks_per_child=1) as pool:
+                    measured = pool.submit(job, kind, tmp, f"t{res}").result()
+                est = memory.estimate(kind, res, res, opaque)
+                print(f"{kind:>20} {res:>5} {opaque:>7} {est / 2**20:>11.1f} {measured / 2**20:>8.1f} "
+                      f"{measured / est:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Mesh stage throughput for 1..N MeshFarm workers.
+
+Run from the repo root:  python -m benchmarks.meshfarm [backend] [jobs] [res]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.textures import make_texture
+from meshfarm import MeshFarm
+
+
+def main():
+    backend = sys.argv[1] if len(sys.argv) > 1 else None
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    res = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f"item{i}" for i in range(jobs)]
+        for i, name in enumerate(names):
+            make_texture(res, seed=i).save(os.path.join(tmp, f"{name}.png"))
+
+        base = None
+        workers = 1
+        while workers <= cores:
+            with MeshFarm(tmp, tmp, workers=workers, backend=backend) as farm:
+                # warm every worker (bpy import) before timing
+                list(farm.map([(names[0], None)] * workers))
+                t0 = time.perf_counter()
+                list(farm.map([(n, None) for n in names]))
+                dt = time.perf_counter() - t0
+            base = base or dt
+            print(f"{workers:>3} workers: {dt:7.2f}s  {jobs / dt:6.1f} meshes/s  speedup {base / dt:4.1f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Face, vertex and size counts for the pixel and merged mesh modes.
+
+Run from the repo root:  python -m benchmarks.meshing
+"""
+import time
+
+from benchmarks.textures import make_texture
+from geometry import MESH_MODES, build_quads, mesh_stats
+
+RESOLUTIONS = (16, 32, 64, 128, 256)
+
+
+def main():
+    print(f"{'res':>5} {'mode':>7} {'faces':>8} {'verts':>8} {'solid':>8} {'~bytes':>10} {'build':>8}")
+    for res in RESOLUTIONS:
+        img = make_texture(res, seed=res)
+        for mode in MESH_MODES:
+            t0 = time.perf_counter()
+            quads = build_quads(img, mode)
+            dt = time.perf_counter() - t0
+            s = mesh_stats(*quads)
+            print(f"{res:>5} {mode:>7} {s['faces']:>8} {s['verts']:>8} {s['solid_faces']:>8} "
+                  f"{s['approx_bytes']:>10} {dt:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Size and speed of the legacy JSON PackUtil string against the compact one.
+
+Run from the repo root:  python -m benchmarks.packutil
+"""
+import json
+import random
+import sys
+import time
+
+from packutil import PackUtil
+from template import TEMPLATE_KEYS
+
+
+def items_for(case, rng):
+    if case == "all ids":
+        return {k: str(rng.randrange(10**10, 10**11)) for k in TEMPLATE_KEYS}
+    if case == "half missing":
+        return {k: str(rng.randrange(10**10, 10**11)) if i % 2 else "0" for i, k in enumerate(TEMPLATE_KEYS)}
+    # many keys share a mesh or texture, so the same id repeats
+    ids = [str(rng.randrange(10**10, 10**11)) for _ in range(12)]
+    return {k: rng.choice(ids) for k in TEMPLATE_KEYS}
+
+
+def per_call(fn, arg, calls=2000):
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn(arg)
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    failed = False
+    print(f"{'case':>14} {'format':>8} {'chars':>6} {'encode':>9} {'decode':>9}  round trip")
+    for case in ("all ids", "half missing", "repeated ids"):
+        items = items_for(case, rng)
+        text = json.dumps(items)
+        for name, encode, arg in (("legacy", PackUtil.compress_json, text),
+                                  ("compact", PackUtil.compress_items, items)):
+            out = encode(arg)
+            ok = PackUtil.decompress_items(out) == items and PackUtil.decompress_json(out) == text
+            failed |= not ok
+            print(f"{case:>14} {name:>8} {len(out):>6} {per_call(encode, arg):>7.1f}us "
+                  f"{per_call(PackUtil.decompress_items, out):>7.1f}us  {'ok' if ok else 'MISMATCH'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare PIL's default PNG encoding of the 512x textures with imaging.encode_png.
+
+Checks that every optimized PNG decodes to the same pixels and reports the
+bytes saved per texture and in total.
+
+Run from the repo root:  python -m benchmarks.png [--workers 4] [--exhaustive]
+"""
+import io
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.textures import make_texture
+from imaging import encode_png, resize_512
+
+RESOLUTIONS = (16, 32, 64, 128, 256, 512)
+
+
+def cases(res):
+    img = make_texture(res, seed=res)
+    opaque = Image.new("RGBA", img.size, (40, 40, 40, 255))
+    opaque.alpha_composite(img)
+    yield "nearest", resize_512(img)
+    yield "bleed", resize_512(img, bleed=True)
+    yield "opaque", resize_512(opaque)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 0
+    optimize = "exhaustive" if "--exhaustive" in sys.argv else True
+    failed = False
+    images = []
+    totals = [0, 0, 0.0, 0.0]
+    print(f"{'res':>5} {'case':>8} {'default':>9} {'ms':>6} {'optimized':>9} {'ms':>6} {'mode':>5} {'saved':>6}  match")
+    for res in RESOLUTIONS:
+        for name, img in cases(res):
+            images.append(img)
+            plain, t_plain = timed(encode_png, img, False)
+            small, t_small = timed(encode_png, img, optimize)
+            decoded = Image.open(io.BytesIO(small))
+            same = np.array_equal(np.asarray(decoded.convert("RGBA")), np.asarray(img))
+            failed |= not same
+            totals[0] += len(plain)
+            totals[1] += len(small)
+            totals[2] += t_plain
+            totals[3] += t_small
+            print(f"{res:>5} {name:>8} {len(plain):>9} {t_plain * 1000:>6.1f} {len(small):>9} {t_small * 1000:>6.1f} "
+                  f"{decoded.mode:>5} {1 - len(small) / len(plain):>6.1%}  {'ok' if same else 'MISMATCH'}")
+    print(f"total: {totals[0]} -> {totals[1]} bytes ({totals[0] - totals[1]} saved, "
+          f"{1 - totals[1] / totals[0]:.1%}), encode {totals[2]:.2f}s -> {totals[3]:.2f}s")
+
+    if workers:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(encode_png, images[:workers]))  # start the workers first
+            _, t_pool = timed(lambda: list(pool.map(encode_png, images)))
+        print(f"{workers} worker processes: {t_pool:.2f}s for {len(images)} textures")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare geometry.pixel_quads against the original per-pixel loop and, when
+bpy is installed, mesh.load_geometry against from_pydata plus per-loop UVs.
+
+Run from the repo root:  python -m benchmarks.quads
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.textures import make_texture
+from geometry import pixel_quads, pixel_quads_reference
+from mesh import load_bpy, load_geometry
+
+RESOLUTIONS = (16, 32, 64, 128, 256)
+
+bpy = load_bpy()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def load_reference(mesh, verts, faces, uvs):
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    for i, uv in enumerate(uvs):
+        uv_layer.data[i].uv = uv
+
+
+def same_mesh(a, b):
+    def arrays(mesh):
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        idx = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", idx)
+        uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers[0].data.foreach_get("uv", uv)
+        return co, idx, uv, len(mesh.edges), len(mesh.polygons)
+    return all(np.array_equal(x, y) for x, y in zip(arrays(a), arrays(b)))
+
+
+def main():
+    failed = False
+    header = f"{'res':>5} {'faces':>7} {'loop':>9} {'numpy':>9} {'speedup':>8}  match"
+    if bpy is not None:
+        header += f" {'from_pydata':>12} {'foreach_set':>12} {'speedup':>8}  match"
+    print(header)
+    pixel_quads(make_texture(16, 0))  # numpy's first call pays for its setup
+    for res in RESOLUTIONS:
+        img = make_texture(res, seed=res)
+        ref, t_ref = timed(pixel_quads_reference, img)
+        new, t_new = timed(pixel_quads, img)
+        same = (np.array_equal(np.array(ref[0], dtype=np.float64).reshape(-1, 3), new[0])
+                and np.array_equal(np.array(ref[1], dtype=np.int64).reshape(-1, 4), new[1])
+                and np.array_equal(np.array(ref[2], dtype=np.float64).reshape(-1, 2), new[2]))
+        failed |= not same
+        line = (f"{res:>5} {len(new[1]):>7} {t_ref:>8.4f}s {t_new:>8.4f}s {t_ref / t_new:>7.1f}x  "
+                f"{'ok' if same else 'MISMATCH'}")
+        if bpy is not None:
+            old_mesh, new_mesh = bpy.data.meshes.new("reference"), bpy.data.meshes.new("foreach_set")
+            _, t_old = timed(load_reference, old_mesh, *ref)
+            _, t_set = timed(load_geometry, new_mesh, *new)
+            same = same_mesh(old_mesh, new_mesh)
+            failed |= not same
+            line += f" {t_old:>11.4f}s {t_set:>11.4f}s {t_old / t_set:>7.1f}x  {'ok' if same else 'MISMATCH'}"
+            bpy.data.meshes.remove(old_mesh)
+            bpy.data.meshes.remove(new_mesh)
+        print(line)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time from launching `python main.py` until the pack dialog opens.
+
+Each run starts a fresh interpreter whose file dialog is a stub that
+reports the time and which heavy modules are loaded at that moment (the
+converter keeps loading in the background). For comparison it also times
+importing the converter, and bpy when it is installed, on their own.
+
+Run from the repo root:  python -m benchmarks.startup [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY = ("bpy", "numpy", "PIL", "requests", "zstandard", "tkinter")
+
+PROBE = """
+import importlib.util, json, runpy, sys, time, types
+if importlib.util.find_spec("config") is None:
+    config = sys.modules["config"] = types.ModuleType("config")
+    config.API_KEY = config.CREATOR_USER_ID = "0"
+import dialogs
+def stub():
+    loaded = [m for m in %r if m in sys.modules]
+    print(json.dumps({"time": time.time(), "loaded": loaded}), flush=True)
+    import os
+    os._exit(0)
+dialogs.pick_zip_file = stub
+runpy.run_path("main.py", run_name="__main__")
+""" % (HEAVY,)
+
+IMPORT = """
+import importlib.util, sys, time, types
+if importlib.util.find_spec("config") is None:
+    config = sys.modules["config"] = types.ModuleType("config")
+    config.API_KEY = config.CREATOR_USER_ID = "0"
+t0 = time.perf_counter()
+import %s
+print(time.perf_counter() - t0)
+"""
+
+
+def prompt_time():
+    t0 = time.time()
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    report = json.loads(out.splitlines()[-1])
+    return report["time"] - t0, report["loaded"]
+
+
+def import_time(module):
+    out = subprocess.run([sys.executable, "-c", IMPORT % module], capture_output=True, text=True)
+    return float(out.stdout.split()[-1]) if out.returncode == 0 else None
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    times = []
+    loaded = set()
+    for _ in range(runs):
+        t, mods = prompt_time()
+        times.append(t)
+        loaded.update(mods)
+    print(f"launch -> pack dialog: median {statistics.median(times) * 1000:.0f} ms, "
+          f"max {max(times) * 1000:.0f} ms over {runs} runs")
+    print(f"already loaded at the dialog: {', '.join(sorted(loaded)) or 'none'} "
+          f"(bpy {'yes' if 'bpy' in loaded else 'no'})")
+    for module in ("converter", "bpy"):
+        t = import_time(module)
+        print(f"import {module}: " + (f"{t * 1000:.0f} ms" if t is not None else "not installed"))
+
+
+if __name__ == "__main__":
+    main()
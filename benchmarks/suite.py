@@ -0,0 +1,260 @@
+"""Per-stage timings of the whole conversion on synthetic packs.
+
+Generates legacy Java, new Java and .mcpack packs at several resolutions,
+padded with decoy entries (sounds, models, OptiFine duplicates of the
+required textures), and times each stage on them separately. Uploads go to
+a local fake Open Cloud server, so no API key is needed.
+
+Run from the repo root:
+    python -m benchmarks.suite [--res 16 64] [--formats legacy new mcpack] [--decoys 0 2000]
+                               [--repeat 3] [--json results.json] [--compare baseline.json]
+
+--json writes machine-readable results (with the git commit they were taken
+at); --compare prints the ratio of every timing to an earlier --json file.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+from functools import partial
+from pathlib import Path
+
+from PIL import Image
+
+from benchmarks.textures import make_texture
+from fakecloud import FakeCloud
+from imaging import resize_png
+from mcpack import get_mcpack_file_base
+from mesh import Mesh
+from meshfarm import find_in_folder
+from newpack import NEW_CLAY_BLOCK_NAMES, get_new_base
+from packutil import PackUtil
+from template import CLAY_BLOCK_NAMES, TEMPLATE_KEYS, build_required_pngs, detect_pack, get_base_name, get_file_base
+from upload import Transport, Upload
+from zip import PackIndex
+
+RESOLUTIONS = (16, 32, 64, 128, 256, 512)
+DECOYS = (0, 1000)
+STAGES = ("detect_extract", "edge_expand_512", "resize_worker", "createMesh", "upload", "compress_json")
+
+# file name mapping, clay names, item folder, block folder, suffix
+FORMATS = {
+    "legacy": (get_file_base, CLAY_BLOCK_NAMES, "assets/minecraft/textures/items/",
+               "assets/minecraft/textures/blocks/", ".zip"),
+    "new": (get_new_base, NEW_CLAY_BLOCK_NAMES, "assets/minecraft/textures/item/",
+            "assets/minecraft/textures/block/", ".zip"),
+    "mcpack": (get_mcpack_file_base, CLAY_BLOCK_NAMES, "textures/items/", "textures/blocks/", ".mcpack"),
+}
+
+_textures = {}
+
+
+def texture_png(res, seed):
+    if (res, seed) not in _textures:
+        buf = io.BytesIO()
+        make_texture(res, seed).save(buf, "PNG")
+        _textures[res, seed] = buf.getvalue()
+    return _textures[res, seed]
+
+
+def write_pack(path, fmt, res, decoys):
+    file_base_fn, clay_names, item_dir, block_dir, _ = FORMATS[fmt]
+    root = item_dir[:item_dir.index("textures/")]
+    blocks = set(clay_names.values())
+    for k in TEMPLATE_KEYS:
+        base, _ = get_base_name(k)
+        if base and base.startswith("clay_"):
+            blocks.add(file_base_fn(base) + ".png")
+    names = sorted(set(build_required_pngs(file_base_fn, clay_names)))
+    if fmt == "new":
+        names.append("netherite_ingot.png")
+
+    rng = random.Random(decoys)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(decoys):
+            kind = i % 4
+            if kind == 0:
+                # incompressible, like real audio
+                zf.writestr(f"{root}sounds/decoy/{i}.ogg", rng.randbytes(8192))
+            elif kind == 1:
+                zf.writestr(f"{root}models/item/decoy_{i}.json", json.dumps({"parent": "item/generated"}))
+            elif kind == 2:
+                zf.writestr(f"{root}textures/entity/decoy_{i}.png", texture_png(16, 1000 + i % 50))
+            else:
+                # same name as a required texture, in a folder that must lose
+                zf.writestr(f"{root}optifine/cit/decoy_{i}/{names[i % len(names)]}", texture_png(16, 2000))
+        for seed, name in enumerate(names):
+            folder = block_dir if name in blocks else item_dir
+            zf.writestr(folder + name, texture_png(res, seed))
+    return path
+
+
+def plan(file_base_fn, clay_names, folder):
+    # the same jobs converter.py derives from TEMPLATE_KEYS, deduplicated by file
+    meshes, textures = {}, {}
+    for k in TEMPLATE_KEYS:
+        base, kind = get_base_name(k)
+        if not base:
+            continue
+        name = file_base_fn(base) + ".png"
+        if not (folder / name).exists():
+            continue
+        if kind == "Mesh":
+            with Image.open(folder / name) as img:
+                if img.width == img.height:
+                    meshes[name[:-4]] = None
+        else:
+            textures[name] = None
+    for name in clay_names.values():
+        if (folder / name).exists():
+            textures[name] = None
+    return list(meshes), list(textures)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def run_case(work, fmt, res, decoys, cloud_url, backend, mesh_mode):
+    pack = write_pack(work / f"pack{FORMATS[fmt][4]}", fmt, res, decoys)
+    assets, exported = work / "assets", work / "exported"
+    for folder in (assets, exported):
+        shutil.rmtree(folder, ignore_errors=True)
+        folder.mkdir()
+    timings, counts = {}, {}
+
+    def detect_extract():
+        with PackIndex(pack) as index:
+            file_base_fn, clay_names = detect_pack(pack, index)
+            extracted = index.extract(build_required_pngs(file_base_fn, clay_names), assets)
+        counts["detect_extract"] = len(extracted)
+        return file_base_fn, clay_names
+
+    t0 = time.perf_counter()
+    file_base_fn, clay_names = detect_extract()
+    timings["detect_extract"] = time.perf_counter() - t0
+    meshes, textures = plan(file_base_fn, clay_names, assets)
+
+    generator = Mesh(assets, exported, partial(find_in_folder, assets), mesh_mode=mesh_mode, backend=backend)
+    images = [Image.open(assets / f"{m}.png").convert("RGBA") for m in meshes]
+    timings["edge_expand_512"] = timed(lambda: [generator._edge_expand_512(img) for img in images])
+    counts["edge_expand_512"] = len(images)
+
+    resized = {}
+    timings["resize_worker"] = timed(lambda: resized.update((n, resize_png(assets / n)) for n in textures))
+    counts["resize_worker"] = len(textures)
+
+    fbx = []
+    timings["createMesh"] = timed(lambda: fbx.extend(generator.createMesh(m) for m in meshes))
+    counts["createMesh"] = len(meshes)
+
+    transport = Transport("benchmark", base_url=cloud_url)
+    uploader = Upload("benchmark", "0", transport=transport)
+
+    def upload_all():
+        futures = [uploader.submitImage(data, name) for name, data in resized.items()]
+        futures += [uploader.submitMesh(path) for path in fbx if path]
+        ids = [f.result() for f in futures]
+        assert all(ids), "fake upload failed"
+
+    timings["upload"] = timed(upload_all)
+    counts["upload"] = len(resized) + len(fbx)
+    uploader.close()
+    transport.close()
+
+    data = json.dumps({k: str(random.randrange(10**10, 10**11)) for k in TEMPLATE_KEYS})
+    calls = 200
+    timings["compress_json"] = timed(lambda: [PackUtil.compress_json(data) for _ in range(calls)]) / calls
+    counts["compress_json"] = 1
+
+    with zipfile.ZipFile(pack) as zf:
+        info = {"pack_bytes": os.path.getsize(pack), "entries": len(zf.infolist())}
+    return timings, counts, info
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    old = {(r["format"], r["res"], r["decoys"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}), new/old:")
+    for r in results:
+        key = (r["format"], r["res"], r["decoys"], r["stage"])
+        if old.get(key):
+            print(f"{r['format']:>7} {r['res']:>4}x {r['decoys']:>6} {r['stage']:>16} {r['seconds'] / old[key]:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every conversion stage on synthetic packs")
+    parser.add_argument("--res", type=int, nargs="+", default=RESOLUTIONS)
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--decoys", type=int, nargs="+", default=DECOYS, help="extra non-texture entries")
+    parser.add_argument("--repeat", type=int, default=1, help="keep the best of this many runs")
+    parser.add_argument("--backend", default=None, help="mesh backend (default: bpy if installed)")
+    parser.add_argument("--mesh-mode", default="pixel")
+    parser.add_argument("--upload-delay", type=float, default=0.05, help="fake operation completion delay")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier --json file to compare against")
+    args = parser.parse_args()
+
+    cloud = FakeCloud(completion_delay=args.upload_delay).start()
+    results = []
+    print(f"{'format':>7} {'res':>5} {'decoys':>6} {'entries':>7} "
+          + " ".join(f"{s:>16}" for s in STAGES))
+    try:
+        for fmt, res, decoys in itertools.product(args.formats, args.res, args.decoys):
+            best = None
+            for _ in range(args.repeat):
+                # the stages' own [OK]/progress lines would bury the table
+                with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+                    timings, counts, info = run_case(Path(tmp), fmt, res, decoys, cloud.url,
+                                                     args.backend, args.mesh_mode)
+                best = timings if best is None else {s: min(best[s], timings[s]) for s in STAGES}
+            for stage in STAGES:
+                results.append({"format": fmt, "res": res, "decoys": decoys, "stage": stage,
+                                "seconds": best[stage], "count": counts[stage], **info})
+            print(f"{fmt:>7} {res:>4}x {decoys:>6} {info['entries']:>7} "
+                  + " ".join(f"{best[s]:>15.4f}s" for s in STAGES))
+    finally:
+        cloud.close()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "backend": args.backend or "auto",
+            "mesh_mode": args.mesh_mode,
+            "repeat": args.repeat,
+            "upload_delay": args.upload_delay,
+        },
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"[OK] Results written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
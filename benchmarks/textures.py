@@ -0,0 +1,19 @@
+import random
+
+from PIL import Image
+
+
+def make_texture(res, seed):
+    # sparse item-like sprite: a few opaque blobs with soft alpha
+    rng = random.Random(seed)
+    img = Image.new("RGBA", (res, res), (0, 0, 0, 0))
+    px = img.load()
+    for _ in range(max(1, res // 4)):
+        cx, cy = rng.randrange(res), rng.randrange(res)
+        r = rng.randint(0, max(1, res // 8))
+        col = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for y in range(max(0, cy - r), min(res, cy + r + 1)):
+            for x in range(max(0, cx - r), min(res, cx + r + 1)):
+                if abs(x - cx) + abs(y - cy) <= r:
+                    px[x, y] = col + (rng.choice((64, 200, 255)),)
+    return img
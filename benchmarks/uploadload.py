@@ -0,0 +1,155 @@
+"""Upload load test against the local fake Open Cloud server.
+
+Pushes many concurrent image uploads through Upload/Transport/OperationPoller
+and reports throughput, per-upload latency (POST until asset id) and request
+counts on both sides.
+
+Run from the repo root:
+    python -m benchmarks.uploadload [--uploads 500] [--concurrency 64] [--latency 0.05]
+        [--completion-delay 0.5] [--rate-429 0.05] [--rate-503 0.02] [--max-connections 32] [--json out.json]
+        [--adaptive 8]
+
+--adaptive N puts the requests under an AdaptiveConcurrency limit starting at
+N (capped by --concurrency) and prints how the limit moved.
+
+Pass --url to load an already running server (python fakecloud.py) instead.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fakecloud import FakeCloud
+from upload import AdaptiveConcurrency, OperationPoller, Transport, Upload
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run(url, uploads, concurrency, size, max_retries, poll_workers, adaptive=None):
+    limit = AdaptiveConcurrency(adaptive, maximum=concurrency) if adaptive else None
+    transport = Transport("loadtest", max_retries=max_retries, pool_size=concurrency + poll_workers, base_url=url,
+                          concurrency=limit)
+    poller = OperationPoller(transport, poll_workers=poll_workers)
+    uploader = Upload("loadtest", "0", transport=transport, poller=poller)
+    payload = os.urandom(size)
+    latencies = []
+    failed = 0
+    lock = threading.Lock()
+    all_done = threading.Event()
+    remaining = uploads
+
+    def finished(start, f):
+        nonlocal failed, remaining
+        with lock:
+            if f.result():
+                latencies.append(time.perf_counter() - start)
+            else:
+                failed += 1
+            remaining -= 1
+            if not remaining:
+                all_done.set()
+
+    def one(i):
+        start = time.perf_counter()
+        uploader.submitImage(payload, f"load_{i}.png").add_done_callback(lambda f: finished(start, f))
+
+    t0 = time.perf_counter()
+    # Upload reports failures with print; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(uploads)))
+        all_done.wait()
+    wall = time.perf_counter() - t0
+
+    result = {
+        "uploads": uploads,
+        "succeeded": len(latencies),
+        "failed": failed,
+        "wall": wall,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "latency": {f"p{p}": percentile(latencies, p) for p in (50, 90, 99)},
+        "client": {
+            "requests": transport.requests,
+            "retries": transport.retries,
+            "poll_requests": poller.stats()["poll_requests"],
+        },
+    }
+    result["latency"]["max"] = max(latencies, default=0.0)
+    if limit:
+        result["concurrency"] = limit.summary()
+        result["concurrency"]["history"] = [(round(t - t0, 3), n, reason) for t, n, reason in limit.history]
+    uploader.close()
+    transport.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test Upload against a fake Open Cloud server")
+    parser.add_argument("--uploads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64, help="threads posting uploads")
+    parser.add_argument("--size", type=int, default=20000, help="bytes per upload")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--poll-workers", type=int, default=4)
+    parser.add_argument("--url", help="use this server instead of starting one")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--completion-delay", type=float, default=0.5)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-503", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--max-connections", type=int)
+    parser.add_argument("--adaptive", type=int, metavar="N", help="adapt the requests in flight, starting at N")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = FakeCloud(latency=args.latency, jitter=args.jitter, completion_delay=args.completion_delay,
+                           rate_429=args.rate_429, rate_503=args.rate_503, retry_after=args.retry_after,
+                           max_connections=args.max_connections, seed=0).start()
+        url = server.url
+    try:
+        result = run(url, args.uploads, args.concurrency, args.size, args.max_retries, args.poll_workers,
+                     args.adaptive)
+        if server:
+            result["server"] = server.stats()
+    finally:
+        if server:
+            server.close()
+
+    lat = result["latency"]
+    print(f"{result['succeeded']}/{result['uploads']} uploads in {result['wall']:.2f}s "
+          f"({result['throughput']:.1f}/s), {result['failed']} failed")
+    print(f"latency p50 {lat['p50']:.3f}s  p90 {lat['p90']:.3f}s  p99 {lat['p99']:.3f}s  max {lat['max']:.3f}s")
+    c = result["client"]
+    print(f"client: {c['requests']} requests, {c['retries']} retries, {c['poll_requests']} polls")
+    if "concurrency" in result:
+        a = result["concurrency"]
+        print(f"concurrency: {a['start']} -> {a['end']} (range {a['min']}-{a['max']}), "
+              f"cut {a['cuts']['error']}x for errors, {a['cuts']['latency']}x for latency")
+        print("  " + " ".join(f"{t:.1f}s:{n}" for t, n, _ in a["history"][-30:]))
+    if "server" in result:
+        s = result["server"]
+        print(f"server: {s['POST']} POST, {s['GET']} GET, statuses {s['statuses']}, "
+              f"{s['connections']} connections (peak {s['peak_connections']})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,93 @@
 API_KEY = "YOUR_API_KEY_HERE"
 CREATOR_USER_ID = "YOUR_USER_ID_HERE"
 
+# fill transparent texels of resized textures/VP images with the nearest
+# opaque colour, so filtered sampling does not pull in black fringes
+BLEED_RESIZED = False
+
+# write textures as the smallest lossless PNG (palette for <= 256 colours,
+# RGB when fully opaque) instead of PIL's default RGBA; "exhaustive" also
+# tries slower zlib settings on truecolour textures (~10% smaller, ~25x the
+# encode time)
+PNG_OPTIMIZE = True
+# also encode every resized texture with PIL's defaults and print the bytes
+# saved (always on with TRACE_FILE)
+PNG_STATS = False
+# processes that decode, resize and encode textures; 0 does it in the resize
+# threads (worth it with several cores, the work mostly holds the GIL)
+PNG_WORKERS = 0
+
+# "pixel" emits one quad per opaque pixel, "merged" joins pixels into larger
+# quads with shared vertices (far fewer faces, same UVs; a quad gets extra
+# corners where a neighbour's corner touches its edge, so nothing cracks)
+MESH_MODE = "pixel"
+# print face/vertex/byte counts for both mesh modes
+MESH_STATS = False
+
+# "bpy" builds meshes in Blender, "native" writes the FBX directly without
+# Blender; None uses bpy when it is installed. In pixel mode bpy also puts
+# walls around every pixel inside the silhouette, native only along its edge
+MESH_BACKEND = None
+
+# mesh worker processes, each with its own Blender scene; 1 builds meshes in
+# the main process, None uses one per CPU core
+MESH_WORKERS = 1
+# replace a mesh worker after this many meshes (None = never)
+MESH_WORKER_MAX_JOBS = None
+
+# SQLite file remembering the asset id of every uploaded texture by content
+# hash, and of every mesh by its source texture and mesh settings, so nothing
+# is uploaded twice (None disables; clear it after changing the mesh code)
+ASSET_CACHE = "asset_cache.sqlite3"
+# treat cached ids older than this many days as missing (None = keep forever)
+ASSET_CACHE_MAX_AGE_DAYS = None
+
+# Open Cloud requests per second across all upload threads (None = no limit)
+UPLOAD_RATE_LIMIT = None
+# retries for 429/5xx responses and dropped connections (asset uploads are
+# only retried when the server cannot have created the asset yet)
+UPLOAD_MAX_RETRIES = 5
+# Open Cloud address; point it at a local `python fakecloud.py` to test
+# uploads without spending real quota
+UPLOAD_BASE_URL = "https://apis.roblox.com"
+# append-only log of every upload's input hash, operation id and asset id;
+# after a crash the next run of the same pack skips finished uploads and
+# re-polls pending ones instead of posting them again; a completed run drops
+# its entries (None disables)
+UPLOAD_JOURNAL = "upload_journal.jsonl"
+# requests in flight start at UPLOAD_CONCURRENCY, grow by about one per round
+# while responses stay fast and halve on 429/5xx or rising latency, up to
+# UPLOAD_MAX_CONCURRENCY; False keeps them fixed at UPLOAD_CONCURRENCY
+UPLOAD_ADAPTIVE = True
+UPLOAD_CONCURRENCY = 8
+UPLOAD_MAX_CONCURRENCY = 64
+# threads that resize textures (None = one per available CPU core)
+RESIZE_WORKERS = None
+
+# resize and mesh jobs only start while the sum of their estimated peak memory
+# stays under this many MB (a 512x pixel mesh needs ~500 MB, a resize ~10 MB);
+# the largest jobs always go first (None = no limit). Estimates are corrected
+# from measured peaks on Linux only; elsewhere they stay as fitted
+MEMORY_BUDGET_MB = None
+# append every job's estimated and measured peak memory to this JSONL file
+MEMORY_LOG = None
+
+# keep extracted, resized and meshed files in memory instead of writing them
+# to assets/ and exported/ (bpy still exports each FBX through a temp file)
+ARTIFACTS_IN_MEMORY = False
+# above this many MB the least recently used files move to ARTIFACT_SPILL_DIR
+# (None = no limit)
+ARTIFACT_MEMORY_LIMIT_MB = 512
+# where spilled files go; None uses /dev/shm when available, else the temp dir
+ARTIFACT_SPILL_DIR = None
+
+# print the PackUtil string in the compact format (asset ids as varints in
+# TEMPLATE_KEYS order, about half as long); the game has to read format 2
+PACK_STRING_COMPACT = False
+
+# write a Chrome trace (chrome://tracing, ui.perfetto.dev) of every stage,
+# job and request to this file and print a per-span summary (None = off)
+TRACE_FILE = None
+# run every span with this name under cProfile, e.g. "createMesh",
+# "image.encode" or "upload.post", and save the stats to profile_<name>.prof
+TRACE_PROFILE = None
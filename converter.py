@@ -0,0 +1,664 @@
+from mesh import Mesh
+from upload import API_BASE_URL, AdaptiveConcurrency, Upload, Transport
+from zip import PackIndex, Zip
+from template import TEMPLATE_KEYS, build_required_pngs, detect_pack, get_base_name
+from packutil import PackUtil
+from imaging import resize_png
+from meshfarm import MeshFarm
+from assetcache import AssetCache, content_digest, file_digest
+from artifacts import ArtifactStore
+from journal import UploadJournal
+from pipeline import Pipeline
+from dialogs import pick_clay_folder
+from memory import MemoryBudget, measured
+from geometry import opaque_count
+from tracing import span, tracer
+from config import API_KEY, CREATOR_USER_ID
+import config
+from pathlib import Path
+from PIL import Image
+import json
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+BASE_DIR = Path(__file__).resolve().parent
+ASSET_DIR = BASE_DIR / "assets"
+EXPORT_DIR = BASE_DIR / "exported"
+
+# optional settings, older config.py files may not define them
+BLEED_RESIZED = getattr(config, "BLEED_RESIZED", False)
+MESH_MODE = getattr(config, "MESH_MODE", "pixel")
+MESH_STATS = getattr(config, "MESH_STATS", False)
+MESH_BACKEND = getattr(config, "MESH_BACKEND", None)
+MESH_WORKERS = getattr(config, "MESH_WORKERS", 1)
+MESH_WORKER_MAX_JOBS = getattr(config, "MESH_WORKER_MAX_JOBS", None)
+ASSET_CACHE = getattr(config, "ASSET_CACHE", BASE_DIR / "asset_cache.sqlite3")
+ASSET_CACHE_MAX_AGE_DAYS = getattr(config, "ASSET_CACHE_MAX_AGE_DAYS", None)
+UPLOAD_RATE_LIMIT = getattr(config, "UPLOAD_RATE_LIMIT", None)
+UPLOAD_MAX_RETRIES = getattr(config, "UPLOAD_MAX_RETRIES", 5)
+UPLOAD_BASE_URL = getattr(config, "UPLOAD_BASE_URL", API_BASE_URL)
+UPLOAD_JOURNAL = getattr(config, "UPLOAD_JOURNAL", "upload_journal.jsonl")
+UPLOAD_ADAPTIVE = getattr(config, "UPLOAD_ADAPTIVE", True)
+UPLOAD_CONCURRENCY = getattr(config, "UPLOAD_CONCURRENCY", 8)
+UPLOAD_MAX_CONCURRENCY = getattr(config, "UPLOAD_MAX_CONCURRENCY", 64)
+RESIZE_WORKERS = getattr(config, "RESIZE_WORKERS", None)
+MEMORY_BUDGET_MB = getattr(config, "MEMORY_BUDGET_MB", None)
+MEMORY_LOG = getattr(config, "MEMORY_LOG", None)
+ARTIFACTS_IN_MEMORY = getattr(config, "ARTIFACTS_IN_MEMORY", False)
+ARTIFACT_MEMORY_LIMIT_MB = getattr(config, "ARTIFACT_MEMORY_LIMIT_MB", 512)
+ARTIFACT_SPILL_DIR = getattr(config, "ARTIFACT_SPILL_DIR", None)
+PNG_OPTIMIZE = getattr(config, "PNG_OPTIMIZE", True)
+PNG_STATS = getattr(config, "PNG_STATS", False)
+PNG_WORKERS = getattr(config, "PNG_WORKERS", 0)
+PACK_STRING_COMPACT = getattr(config, "PACK_STRING_COMPACT", False)
+TRACE_FILE = getattr(config, "TRACE_FILE", None)
+TRACE_PROFILE = getattr(config, "TRACE_PROFILE", None)
+
+def find_asset(filename, folder=ASSET_DIR):
+    p = Path(folder) / filename
+    return str(p) if p.exists() else None
+
+def available_cores():
+    # the cores this process may run on, which can be fewer than the machine has
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ConvertRun:
+    """The state of one Converter.convert call and its stage workers.
+
+    Holds the pipeline of a pack's resize, mesh and upload nodes, plus what
+    the workers share while it runs: the journal job of every upload, the
+    upload futures by output digest, the source digests and asset ids for
+    the next incremental build, and the counters the summary prints.
+    """
+
+    def __init__(self, converter, previous=None):
+        self.converter = converter
+        self.generator, self.uploader, self.cache = converter.generator, converter.uploader, converter.cache
+        self.store, self.png_pool, self.journal = converter.store, converter.png_pool, converter.journal
+        self.memory = converter.memory
+        self.asset_dir = converter.asset_dir
+
+        self.mesh_stats = {}
+        self.new_values = {}
+        self.clay_json = {}
+
+        self.png_lock = threading.Lock()
+        self.png_totals = {"textures": 0, "bytes": 0, "default_bytes": 0}
+        # the size with PIL's defaults costs one more encode per texture
+        self.png_baseline = PNG_STATS or tracer.enabled
+
+        # identical outputs (e.g. a clay texture that is also an item texture)
+        # are uploaded once and every node waiting on them shares the id
+        self.uploads_by_digest = {}
+        self.upload_lock = threading.Lock()
+        self.same_output = 0
+
+        # every artifact is a named node; uploads start as soon as their input
+        # file exists instead of after the whole previous phase
+        self.pipe = Pipeline(self.memory)
+        self.pipe.stage("resize", converter.resize_pool, limit=2 * converter.resize_workers)
+        self.pipe.stage("mesh")
+        self.pipe.stage("derive")
+        self.pipe.stage("upload", converter.upload_pool, limit=converter.upload_threads)
+        self.upload_keys = {}
+        self.planned = 0
+        self.mesh_kind = f"mesh_{self.generator.backend}_{MESH_MODE}"
+        self.resize_kind = "resize_bleed" if BLEED_RESIZED else "resize"
+        # node -> [width, height, opaque pixels] its memory estimate is based on
+        self.job_sizes = {}
+        self.build_mesh = self.farm_mesh_worker if converter.farm else self.mesh_worker
+
+        # upload node -> [source digest, asset id], for the next incremental build
+        self.prior = previous["sources"] if previous else {}
+        self.sources = {}
+        self.source_digests = {}
+        # upload node -> journal job: its pack and source plus everything that changes the upload
+        self.job_keys = {}
+        # mesh upload node -> what the asset cache knows it by; bpy stamps the
+        # export time into every FBX, so the bytes never match between runs
+        self.mesh_keys = {}
+        self.settings = [self.journal.pack if self.journal else None, self.generator.backend, MESH_MODE,
+                         BLEED_RESIZED, PNG_OPTIMIZE, CREATOR_USER_ID, UPLOAD_BASE_URL]
+        self.reused = 0
+        self.resumed = 0
+
+    def source(self, name):
+        # an extracted pack file: a store entry, or its path in assets/
+        return self.store.open(name) if self.store is not None else self.asset_dir / name
+
+    def has(self, name):
+        return name in self.store if self.store is not None else (self.asset_dir / name).exists()
+
+    def artifact(self, path):
+        # how a file createMesh wrote is referred to in this mode
+        return path.name if self.store is not None else str(path)
+
+    def resize_worker(self, src, dst):
+        # src is a pack file name, or the path of a clay texture outside it
+        src = self.source(src) if isinstance(src, str) else src
+        if self.png_pool is not None:
+            raw = src.read() if hasattr(src, "read") else Path(src).read_bytes()
+            data, grown = self.png_pool.submit(measured, resize_png, raw, BLEED_RESIZED,
+                                               PNG_OPTIMIZE, self.png_baseline).result()
+            self.memory.report(grown)
+        else:
+            data = resize_png(src, BLEED_RESIZED, PNG_OPTIMIZE, self.png_baseline)
+        data, default_size = data if self.png_baseline else (data, 0)
+        with self.png_lock:
+            self.png_totals["textures"] += 1
+            self.png_totals["bytes"] += len(data)
+            self.png_totals["default_bytes"] += default_size
+        if self.store is not None:
+            return self.store.put(dst, data)
+        (self.asset_dir / dst).write_bytes(data)
+        return str(self.asset_dir / dst)
+
+    def mesh_worker(self, file_base):
+        fbx = self.generator.createMesh(file_base)
+        if fbx and file_base in self.generator.stats:
+            self.mesh_stats[file_base] = self.generator.stats[file_base]
+        return fbx
+
+    def farm_mesh_worker(self, file_base):
+        out = Future()
+
+        def done(f):
+            try:
+                fbx, _, stats, extras = f.result()
+            except Exception as e:
+                out.set_exception(e)
+                return
+            if fbx and stats:
+                self.mesh_stats[file_base] = stats
+            if extras.get("peak") is not None:
+                name = f"fbx:{file_base}"
+                self.memory.observe(name, self.mesh_kind, self.pipe.nodes[name].cost, extras["peak"])
+            for name, data in extras.get("outputs", {}).items():
+                self.store.put(name, data)
+            if "spans" in extras:
+                tracer.extend(extras["spans"])
+            out.set_result(fbx)
+
+        data = self.store.get(f"{file_base}.png") if self.store is not None else None
+        self.converter.farm.submit(file_base, None, data).add_done_callback(done)
+        return out
+
+    def journaled(self, node, future):
+        # the journal learns how every upload job ended
+        job = self.job_keys.get(node)
+        journal = self.journal
+        if journal and job:
+            future.add_done_callback(
+                lambda f: journal.finished(job, f.result()) if not f.exception() and f.result()
+                else journal.failed(job))
+        return future
+
+    def resume_worker(self, node, op_id):
+        return self.journaled(node, self.uploader.resume(op_id, node))
+
+    def upload_worker(self, typ, node, path):
+        # only the POST runs here; the shared poller resolves the future
+        store, cache, journal, uploader = self.store, self.cache, self.journal, self.uploader
+        data, name = path, None
+        if store is not None:
+            data, name = store.get(path), path
+        digest = self.mesh_keys.get(node)
+        if digest is None:
+            digest = content_digest(data) if store is not None else file_digest(path)
+        job = self.job_keys.get(node) if journal else None
+        with self.upload_lock:
+            shared = self.uploads_by_digest.get((typ, digest))
+            if shared is not None:
+                self.same_output += 1
+                return self.journaled(node, shared)
+            out = self.uploads_by_digest[(typ, digest)] = Future()
+        self.journaled(node, out)
+        try:
+            with span("upload.cache_lookup") as sp:
+                aid = cache.get(digest, typ) if cache else None
+                sp.set(hit=bool(aid))
+            if aid:
+                out.set_result(aid)
+                return out
+            # rebuilt only because other uploads of its file were missing;
+            # the interrupted run had already posted this one
+            op_id = journal.operation(job) if job else None
+            if op_id:
+                fut = uploader.resume(op_id, name)
+            else:
+                if job:
+                    journal.started(job)
+                on_operation = partial(journal.posted, job) if job else None
+                submit = uploader.submitMesh if typ == "mesh" else uploader.submitImage
+                fut = submit(data, name, on_operation=on_operation)
+        except Exception as e:
+            out.set_exception(e)
+            raise
+
+        def done(f):
+            try:
+                aid = f.result()
+            except Exception as e:
+                out.set_exception(e)
+                return
+            if aid and cache:
+                cache.put(digest, typ, aid)
+            out.set_result(aid)
+
+        fut.add_done_callback(done)
+        return out
+
+    def assign(self, aid, keys):
+        for k in keys:
+            if k.startswith("CLAY:"):
+                self.clay_json[k.split(":",1)[1]] = str(aid)
+            else:
+                self.new_values[k] = str(aid)
+
+    def add_node(self, name, stage, fn, inputs=(), kind=None, size=None):
+        # nodes are named by source file and transform, so template keys
+        # that resolve to the same file (jump/speed potion, a VP image
+        # and a texture of the same item) share one job
+        self.planned += 1
+        if name not in self.pipe.nodes:
+            cost = self.memory.estimate(kind, *size) if kind else 0
+            if kind:
+                self.job_sizes[name] = list(size)
+            self.pipe.add(name, stage, fn, inputs, cost=cost, kind=kind)
+
+    def add_upload(self, node, typ, keys):
+        name = f"upload:{node}"
+        self.add_node(name, "upload", partial(self.upload_worker, typ, name), [node])
+        self.upload_keys.setdefault(name, []).extend(keys)
+
+    def add_resize(self, src, keys, size=None):
+        # src is a pack file name or the Path of a clay texture outside it
+        name = f"resize:{src}"
+        if self.reuse(src, {f"upload:{name}": keys}):
+            return
+        if size is None:
+            with Image.open(self.source(src) if isinstance(src, str) else src) as img:
+                size = img.size
+        self.add_node(name, "resize", partial(self.resize_worker, src, f"{Path(src).stem}_512.png"),
+                      kind=self.resize_kind, size=size)
+        self.add_upload(name, "tex", keys)
+
+    def source_digest(self, src):
+        if src not in self.source_digests:
+            if isinstance(src, str) and self.store is not None:
+                self.source_digests[src] = content_digest(self.store.get(src))
+            else:
+                self.source_digests[src] = file_digest(self.asset_dir / src if isinstance(src, str) else src)
+        return self.source_digests[src]
+
+    def reuse(self, src, uploads):
+        # a file's uploads all keep their ids (from the previous build or
+        # the journal) or resume their pending operations, else all are redone
+        journal = self.journal
+        digest = self.source_digest(src)
+        found = {}
+        for name in uploads:
+            self.sources[name] = [digest, None]
+            job = content_digest("\0".join(map(str, [name, digest, *self.settings])).encode())
+            self.job_keys[name] = job
+            if name.startswith("upload:fbx:"):
+                # the same key minus the pack, so other packs share it too
+                mesh_key = [name, digest, *self.settings[1:]]
+                self.mesh_keys[name] = content_digest("\0".join(map(str, mesh_key)).encode())
+            old = self.prior.get(name)
+            if old and old[0] == digest and old[1]:
+                found[name] = ("asset", old[1])
+            elif journal and journal.asset(job):
+                found[name] = ("asset", journal.asset(job))
+            elif journal and journal.operation(job):
+                found[name] = ("operation", journal.operation(job))
+        if len(found) < len(uploads):
+            return False
+        for name, keys in uploads.items():
+            kind, value = found[name]
+            if kind == "asset":
+                self.sources[name][1] = value
+                self.assign(value, keys)
+                self.reused += 1
+            else:
+                self.add_node(name, "upload", partial(self.resume_worker, name, value))
+                self.upload_keys.setdefault(name, []).extend(keys)
+                self.resumed += 1
+        return True
+
+    def plan(self, pack_file_base_fn, base_info, clay_blocks):
+        generator = self.generator
+        for base, info in base_info.items():
+            file_base = pack_file_base_fn(base)
+            src_png = f"{file_base}.png"
+            if not self.has(src_png):
+                continue
+            with Image.open(self.source(src_png)) as img:
+                w, h = img.size
+                if info["mesh"] and w != h:
+                    info["mesh"] = []
+                # meshes cost memory per opaque pixel, so count them up front
+                opaque = opaque_count(img) if info["mesh"] else 0
+            if info["mesh"]:
+                uploads = {f"upload:fbx:{file_base}": info["mesh"]}
+                if info["tex"]:
+                    uploads[f"upload:expanded:{file_base}"] = info["tex"]
+                if self.reuse(src_png, uploads):
+                    if info["vp"]:
+                        self.add_resize(src_png, info["vp"], (w, h))
+                    continue
+                self.add_node(f"fbx:{file_base}", "mesh", partial(self.build_mesh, file_base),
+                              kind=self.mesh_kind, size=(w, h, opaque))
+                self.add_upload(f"fbx:{file_base}", "mesh", info["mesh"])
+            if info["tex"] and info["mesh"]:
+                # createMesh writes the edge-expanded texture the mesh uses, and
+                # that is what the Texture keys get too
+                self.add_node(f"expanded:{file_base}", "derive",
+                              lambda fbx, fb=file_base: self.artifact(generator.texture_path(fb)),
+                              [f"fbx:{file_base}"])
+                self.add_upload(f"expanded:{file_base}", "tex", info["tex"])
+            elif info["tex"]:
+                self.add_resize(src_png, info["tex"], (w, h))
+            if info["vp"]:
+                self.add_resize(src_png, info["vp"], (w, h))
+
+        for ck, cp in clay_blocks.items():
+            self.add_resize(cp, [f"CLAY:{ck}"])
+
+    def run(self):
+        if any(node.stage.name == "mesh" for node in self.pipe.nodes.values()):
+            (self.converter.farm or self.generator).warm()
+        results = self.pipe.run()
+        for name, keys in self.upload_keys.items():
+            if results.get(name):
+                self.assign(results[name], keys)
+                if name in self.sources:
+                    self.sources[name][1] = results[name]
+        return results
+
+
+class Converter:
+    """Converts packs one after another, sharing everything that is costly to
+    set up: the mesh generator/worker farm, thread pools, HTTP session,
+    operation poller and asset cache.
+
+    A workspace folder replaces assets/ and exported/ and holds the upload
+    journal, so several converters (in separate processes) can work side
+    by side.
+    """
+
+    def __init__(self, trace_file=TRACE_FILE, profile=TRACE_PROFILE, workspace=None):
+        self.asset_dir = Path(workspace) / "assets" if workspace else ASSET_DIR
+        self.export_dir = Path(workspace) / "exported" if workspace else EXPORT_DIR
+        self.trace_file = trace_file
+        self.profile = profile
+        if trace_file or profile:
+            tracer.enable(profile)
+        # in-memory mode keeps extracted, resized and meshed files in the store
+        # instead of assets/ and exported/
+        self.store = None
+        if ARTIFACTS_IN_MEMORY:
+            limit = ARTIFACT_MEMORY_LIMIT_MB * 2**20 if ARTIFACT_MEMORY_LIMIT_MB else None
+            self.store = ArtifactStore(limit, ARTIFACT_SPILL_DIR)
+        self.generator = Mesh(base_folder=self.asset_dir, output_path=self.export_dir,
+                              find_asset_fn=partial(find_asset, folder=self.asset_dir),
+                              mesh_mode=MESH_MODE, report_stats=MESH_STATS, backend=MESH_BACKEND,
+                              store=self.store, optimize_png=PNG_OPTIMIZE)
+        # requests in flight grow while Open Cloud keeps up and are cut on
+        # 429/5xx or rising latency; the upload threads only cap the limit
+        self.concurrency = None
+        upload_threads = UPLOAD_CONCURRENCY
+        if UPLOAD_ADAPTIVE:
+            self.concurrency = AdaptiveConcurrency(UPLOAD_CONCURRENCY, maximum=UPLOAD_MAX_CONCURRENCY)
+            upload_threads = max(UPLOAD_CONCURRENCY, UPLOAD_MAX_CONCURRENCY)
+        self.transport = Transport(API_KEY, max_retries=UPLOAD_MAX_RETRIES, rate_limit=UPLOAD_RATE_LIMIT,
+                                   pool_size=upload_threads + 4, base_url=UPLOAD_BASE_URL,
+                                   concurrency=self.concurrency)
+        self.uploader = Upload(api_key=API_KEY, creator_user_id=CREATOR_USER_ID, transport=self.transport)
+        self.cache = None
+        if ASSET_CACHE:
+            max_age = ASSET_CACHE_MAX_AGE_DAYS * 86400 if ASSET_CACHE_MAX_AGE_DAYS else None
+            self.cache = AssetCache(BASE_DIR / ASSET_CACHE, owner=CREATOR_USER_ID, max_age=max_age)
+        self.journal = None
+        if UPLOAD_JOURNAL:
+            journal_path = Path(workspace) / Path(UPLOAD_JOURNAL).name if workspace else BASE_DIR / UPLOAD_JOURNAL
+            self.journal = UploadJournal(journal_path)
+        # resize and mesh jobs only start while their estimated peak memory fits
+        self.memory = MemoryBudget(MEMORY_BUDGET_MB * 2**20 if MEMORY_BUDGET_MB else None)
+        self.resize_workers = RESIZE_WORKERS or available_cores()
+        self.resize_pool = ThreadPoolExecutor(max_workers=self.resize_workers)
+        self.upload_threads = upload_threads
+        self.upload_pool = ThreadPoolExecutor(max_workers=upload_threads)
+        # decode/resize/encode holds the GIL most of the time, so it can go to processes
+        self.png_pool = None
+        if PNG_WORKERS:
+            self.png_pool = ProcessPoolExecutor(max_workers=PNG_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        # the pool only spawns as many workers as there are meshes in flight
+        self.farm = None
+        if MESH_WORKERS != 1:
+            self.farm = MeshFarm(self.asset_dir, self.export_dir, workers=MESH_WORKERS,
+                                 max_jobs_per_worker=MESH_WORKER_MAX_JOBS, in_memory=ARTIFACTS_IN_MEMORY,
+                                 trace=tracer.enabled, mesh_mode=MESH_MODE,
+                                 report_stats=MESH_STATS, backend=MESH_BACKEND, optimize_png=PNG_OPTIMIZE)
+
+    def close(self):
+        self.resize_pool.shutdown()
+        self.upload_pool.shutdown()
+        if self.png_pool:
+            self.png_pool.shutdown()
+        if self.farm:
+            self.farm.close()
+        self.uploader.close()
+        self.transport.close()
+        if self.cache:
+            self.cache.close()
+        if self.journal:
+            self.journal.close()
+        if self.store:
+            self.store.clear()
+        self.finish_trace()
+
+    def cleanup(self):
+        # leftovers of a failed pack would be picked up by the next one
+        if self.store is not None:
+            self.store.clear()
+        else:
+            Zip(assets_folder=self.asset_dir, exported_folder=self.export_dir).cleanup()
+
+    def finish_trace(self):
+        if not tracer.enabled:
+            return
+        print("Trace summary:")
+        tracer.print_summary()
+        if self.trace_file:
+            tracer.write_chrome(self.trace_file)
+            print(f"[OK] Chrome trace written to {self.trace_file} (open in chrome://tracing or ui.perfetto.dev)")
+        if self.profile:
+            path = f"profile_{self.profile}.prof"
+            tracer.write_profile(path)
+            print(f"[OK] cProfile stats for {self.profile!r} spans written to {path}")
+
+    def convert(self, zp, clay_folder=None, ask_clay=False, previous=None):
+        """Convert one pack and return its asset ids, PackUtil string and timings.
+
+        Clay textures missing from the pack are looked up in clay_folder, or
+        asked for with a folder dialog when ask_clay is set. With the result
+        of an earlier build of the same pack as previous, textures whose
+        source file is unchanged keep their asset ids without being resized,
+        meshed or uploaded again.
+        """
+        generator, uploader, cache, farm = self.generator, self.uploader, self.cache, self.farm
+        transport, store, journal = self.transport, self.store, self.journal
+        memory = self.memory
+        memory_since = memory.mark()
+        polls_before = uploader.poller.stats()["poll_requests"]
+        requests_before = transport.requests
+        concurrency_since = time.monotonic()
+        if journal:
+            # only an interrupted run of this very pack is resumed
+            journal.begin(file_digest(zp))
+        zipper = None
+        if store is not None:
+            # a failed previous pack may have left its files behind
+            store.clear()
+        else:
+            zipper = Zip(assets_folder=self.asset_dir, exported_folder=self.export_dir)
+
+        total_timer_start = time.time()
+        trace_start = time.perf_counter()
+        # one read of the central directory serves detection and extraction
+        with span("extract", pack=Path(zp).name), PackIndex(zp) as index:
+            pack_file_base_fn, clay_name_map = detect_pack(zp, index)
+            # bpy takes seconds to load: if the pack has mesh textures, start
+            # it now so it overlaps extraction (a rebuild waits for its plan)
+            mesh_pngs = [f"{pack_file_base_fn(base)}.png"
+                         for base, kind in map(get_base_name, TEMPLATE_KEYS) if base and kind == "Mesh"]
+            if previous is None and index.has_any(mesh_pngs):
+                (farm or generator).warm()
+
+            required_pngs = build_required_pngs(pack_file_base_fn, clay_name_map)
+            if store is not None:
+                index.load(required_pngs, store)
+            else:
+                zipper.unzip_pack(zp, required_pngs, index)
+        extract_duration = time.time() - total_timer_start
+
+        base_info = {}
+        for k in TEMPLATE_KEYS:
+            base, kind = get_base_name(k)
+            if not base:
+                continue
+            d = base_info.setdefault(base, {"mesh":[], "tex":[], "vp":[]})
+            d["mesh"].append(k) if kind=="Mesh" else d["vp"].append(k) if kind=="VPImage" else d["tex"].append(k)
+
+        run = ConvertRun(self, previous)
+        clay_blocks = {}
+        for ck, fname in clay_name_map.items():
+            if run.has(fname):
+                clay_blocks[ck] = fname
+
+        if not clay_blocks:
+            folder = clay_folder
+            if not folder and ask_clay:
+                folder = pick_clay_folder()
+            if folder:
+                folder = Path(folder)
+                for ck, fname in clay_name_map.items():
+                    candidate = folder / fname
+                    if candidate.exists():
+                        clay_blocks[ck] = candidate
+
+        run.plan(pack_file_base_fn, base_info, clay_blocks)
+        run.run()
+        pipe, png_totals, png_baseline = run.pipe, run.png_totals, run.png_baseline
+        planned, same_output, reused, resumed = run.planned, run.same_output, run.reused, run.resumed
+
+        resize_duration = pipe.stages["resize"].duration
+        mesh_duration = pipe.stages["mesh"].duration
+        upload_duration = pipe.stages["upload"].duration
+        total_duration = time.time() - total_timer_start
+        tracer.record("convert", trace_start, time.perf_counter(), pack=Path(zp).name)
+
+        print(f"Extract time: {extract_duration:.2f}s")
+        print(f"Resize time: {resize_duration:.2f}s")
+        print(f"Mesh time: {mesh_duration:.2f}s")
+        print(f"Upload time: {upload_duration:.2f}s")
+        compared = ""
+        if png_baseline:
+            saved = png_totals["default_bytes"] - png_totals["bytes"]
+            compared = (f" ({png_totals['default_bytes'] / 1024:.1f} KB with PIL's defaults, "
+                        f"{saved / 1024:.1f} KB saved)")
+        print(f"Resized textures: {png_totals['textures']} PNGs, {png_totals['bytes'] / 1024:.1f} KB{compared}")
+        print(f"Total time: {total_duration:.2f}s")
+        same_source = planned - len(pipe.nodes)
+        print(f"Jobs: {len(pipe.nodes) - same_output} run for {planned} planned "
+              f"({same_source} removed as the same source and transform, {same_output} as identical output)")
+        if reused or resumed:
+            print(f"Reused {reused} finished uploads of unchanged textures, resumed {resumed} pending operations")
+        mem = memory.summary(memory_since)
+        if mem["largest"]:
+            big = mem["largest"]
+            budget = f" of {MEMORY_BUDGET_MB} MB budget" if MEMORY_BUDGET_MB else ""
+            print(f"Memory: {mem['jobs']} jobs measured ({mem['exact']} alone), largest {big['job']} "
+                  f"{big['peak'] / 2**20:.1f} MB (estimated {big['estimate'] / 2**20:.1f} MB), "
+                  f"at most {mem['peak_in_use'] / 2**20:.1f} MB estimated in flight{budget}")
+        if mem["guessed"]:
+            print(f"[WARN] Memory estimates for {', '.join(mem['guessed'])} are unmeasured guesses; "
+                  f"refit them with python -m benchmarks.memory")
+        if MEMORY_LOG:
+            # measured peaks next to what the estimates were based on, to refit JOB_COSTS
+            with open(BASE_DIR / MEMORY_LOG, "a", encoding="utf-8") as f:
+                for rec in mem["records"]:
+                    f.write(json.dumps({**rec, "size": run.job_sizes.get(rec["job"])}) + "\n")
+        if self.concurrency:
+            c = self.concurrency.summary(concurrency_since)
+            print(f"Upload concurrency: {c['start']} -> {c['end']} (range {c['min']}-{c['max']}, "
+                  f"cut {c['cuts']['error']}x for 429/5xx/errors, {c['cuts']['latency']}x for latency)")
+        requests_made = transport.requests - requests_before
+        polls_made = uploader.poller.stats()["poll_requests"] - polls_before
+        print(f"HTTP requests: {requests_made} ({transport.retries} retried in total, "
+              f"{polls_made} operation polls)")
+        if cache:
+            st = cache.stats()
+            print(f"Asset cache: {st['hits']} hits, {st['misses']} misses, {st['entries']} entries")
+
+        mesh_stats = run.mesh_stats
+        if MESH_STATS and mesh_stats:
+            for mode in ("pixel", "merged"):
+                faces = sum(s[mode]["solid_faces"] for s in mesh_stats.values())
+                verts = sum(s[mode]["solid_verts"] for s in mesh_stats.values())
+                size = sum(s[mode]["approx_bytes"] for s in mesh_stats.values())
+                print(f"Mesh {mode}: {faces} faces, {verts} verts, ~{size} bytes")
+            print(f"Mesh FBX total: {sum(s['fbx_bytes'] for s in mesh_stats.values())} bytes")
+
+        final_data = {k: run.new_values.get(k,"0") for k in TEMPLATE_KEYS}
+
+        compressed = None
+        if PACK_STRING_COMPACT:
+            try:
+                compressed = PackUtil.compress_items(final_data)
+            except ValueError as e:
+                print(f"[WARN] {e}, using the JSON pack string")
+        if compressed is None:
+            compressed = PackUtil.compress_json(json.dumps(final_data))
+
+        if store is not None:
+            st = store.stats()
+            print(f"Artifacts: peak {st['peak_bytes'] / 2**20:.1f} MB in memory, "
+                  f"{st['spills']} spilled ({st['spilled_bytes'] / 2**20:.1f} MB)")
+            store.clear()
+        else:
+            zipper.cleanup()
+        if journal:
+            journal.complete()
+        return {
+            "pack": str(zp),
+            "items": final_data,
+            "compressed": compressed,
+            "clay": run.clay_json,
+            "timings": {
+                "extract": extract_duration,
+                "resize": resize_duration,
+                "mesh": mesh_duration,
+                "upload": upload_duration,
+                "total": total_duration,
+            },
+            "requests": requests_made,
+            "concurrency": self.concurrency.summary(concurrency_since) if self.concurrency else None,
+            "memory": mem,
+            "png_bytes": png_totals["bytes"],
+            "png_default_bytes": png_totals["default_bytes"] if png_baseline else None,
+            "jobs": {"planned": planned, "same_source": same_source, "same_output": same_output,
+                     "reused": reused, "resumed": resumed},
+            "sources": {name: pair for name, pair in run.sources.items() if pair[1]},
+        }
+
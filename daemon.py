@@ -0,0 +1,378 @@
+import argparse
+import json
+import multiprocessing
+import signal
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing.connection import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from main import load_config
+
+BASE_DIR = Path(__file__).resolve().parent
+PACK_SUFFIXES = (".zip", ".mcpack")
+STAGES = ("extract", "resize", "mesh", "upload", "total")
+# what a finished job keeps of its Converter.convert result
+RESULT_KEYS = ("items", "compressed", "clay", "timings", "requests", "png_bytes", "png_default_bytes", "jobs")
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def _worker(workspace, conn):
+    # one Converter per process, kept for every pack it gets: bpy and its
+    # mesh session, the resize/PNG/upload pools and the HTTP connections.
+    # Ctrl+C reaches the whole process group; the daemon decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from converter import Converter
+    converter = Converter(trace_file=None, profile=None, workspace=workspace)
+    (converter.farm or converter.generator).warm()
+    conn.send(("ready", None, None))
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                # the daemon is gone
+                break
+            if job is None:
+                break
+            job_id, pack, clay_dir = job
+            try:
+                result = converter.convert(pack, clay_folder=clay_dir)
+            except Exception as e:
+                print(f"[ERROR] Job {job_id} failed: {e!r}")
+                converter.cleanup()
+                conn.send(("failed", job_id, repr(e)))
+            else:
+                conn.send(("done", job_id, {k: result[k] for k in RESULT_KEYS}))
+    finally:
+        converter.close()
+
+
+class Daemon:
+    """Keeps `workers` converter processes warm and feeds them submitted packs.
+
+    Every worker owns a Converter in its own workspace folder (extracted and
+    exported files, upload journal), so packs run side by side without
+    seeing each other's files, and everything costly to set up stays alive
+    between packs. Packs wait in a queue until a worker is free; a worker
+    that dies fails its pack and is replaced. `worker` is the function every
+    worker process runs, _worker unless a test swaps in its own.
+    """
+
+    def __init__(self, workers=2, workspace=BASE_DIR / "workspaces", keep=1000, worker=_worker):
+        self.workspace = Path(workspace)
+        self.spool = self.workspace / "incoming"
+        self.keep = keep
+        self.worker = worker
+        self.ctx = multiprocessing.get_context("spawn")
+        self.cond = threading.Condition()
+        self.jobs = {}
+        self.pending = deque()
+        self.slots = [None] * workers
+        self.finished = deque(maxlen=keep)
+        self.counts = {"submitted": 0, "done": 0, "failed": 0}
+        self.started = time.time()
+        self.closing = False
+        self._threads = []
+
+    def start(self):
+        self.spool.mkdir(parents=True, exist_ok=True)
+        for slot in range(len(self.slots)):
+            self._spawn(slot)
+        for target in (self._collect, self._dispatch):
+            thread = threading.Thread(target=target, name=f"daemon{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _spawn(self, slot):
+        folder = self.workspace / f"worker{slot}"
+        folder.mkdir(parents=True, exist_ok=True)
+        # a pipe per worker: one that dies mid-message cannot garble the others
+        conn, child = self.ctx.Pipe()
+        # not a daemonic process: workers start mesh/PNG pools of their own
+        process = self.ctx.Process(target=self.worker, args=(str(folder), child), name=f"autopack-worker{slot}")
+        process.start()
+        child.close()
+        self.slots[slot] = {"process": process, "conn": conn, "job": None, "ready": False, "dead": False}
+
+    def submit(self, name, data, clay_dir=None):
+        name = Path(name).name
+        if Path(name).suffix.lower() not in PACK_SUFFIXES:
+            raise ValueError(f"{name} is not a .zip/.mcpack file")
+        job_id = uuid.uuid4().hex[:12]
+        path = self.spool / f"{job_id}-{name}"
+        path.write_bytes(data)
+        job = {"id": job_id, "name": name, "status": "queued", "worker": None, "error": None,
+               "submitted": time.time(), "started": None, "finished": None}
+        with self.cond:
+            self.jobs[job_id] = dict(job, path=str(path), clay_dir=clay_dir)
+            self.pending.append(job_id)
+            self.counts["submitted"] += 1
+            self.cond.notify_all()
+        return job
+
+    def _dispatch(self):
+        while True:
+            with self.cond:
+                while not self.closing and not (self.pending and self._idle() is not None):
+                    self.cond.wait()
+                if self.closing:
+                    return
+                slot = self._idle()
+                job = self.jobs[self.pending.popleft()]
+                try:
+                    self.slots[slot]["conn"].send((job["id"], job["path"], job["clay_dir"]))
+                except (OSError, ValueError):
+                    # the worker died since it said it was ready: the job goes
+                    # back to the front of the queue and _collect replaces it
+                    self.pending.appendleft(job["id"])
+                    self.slots[slot].update(ready=False, dead=True)
+                    continue
+                job.update(status="running", started=time.time(), worker=slot)
+                self.slots[slot]["job"] = job["id"]
+
+    def _idle(self):
+        for slot, state in enumerate(self.slots):
+            if state["ready"] and state["job"] is None:
+                return slot
+        return None
+
+    def _collect(self):
+        # worker messages, and workers that exited without being asked to;
+        # the only thread that replaces workers
+        while not self.closing:
+            with self.cond:
+                sources = {}
+                for slot, state in enumerate(self.slots):
+                    if state["dead"]:
+                        state["process"].kill()
+                    sources[state["conn"]] = slot
+                    sources[state["process"].sentinel] = slot
+            try:
+                ready = wait(list(sources), timeout=1.0)
+            except (OSError, ValueError):
+                continue
+            for slot in dict.fromkeys(sources[r] for r in ready):
+                state = self.slots[slot]
+                try:
+                    while state["conn"].poll():
+                        self._handle(slot, *state["conn"].recv())
+                except (EOFError, OSError, ValueError):
+                    pass
+                if not state["process"].is_alive() and not self.closing:
+                    self._replace(slot)
+
+    def _handle(self, slot, kind, job_id, payload):
+        with self.cond:
+            if kind == "ready":
+                self.slots[slot]["ready"] = True
+            else:
+                self._finish(slot, job_id, kind, payload)
+            self.cond.notify_all()
+
+    def _finish(self, slot, job_id, status, payload):
+        # caller holds self.cond
+        job = self.jobs.get(job_id)
+        if self.slots[slot]["job"] == job_id:
+            self.slots[slot]["job"] = None
+        if job is None or job["status"] != "running":
+            return
+        job.update(status=status, finished=time.time())
+        if status == "done":
+            job["result"] = payload
+        else:
+            job["error"] = payload
+        self.counts[status] += 1
+        self.finished.append(job)
+        Path(job["path"]).unlink(missing_ok=True)
+        # forget the oldest finished jobs beyond `keep`
+        for old in list(self.jobs):
+            if len(self.jobs) <= self.keep:
+                break
+            if self.jobs[old]["status"] in ("done", "failed"):
+                del self.jobs[old]
+
+    def _replace(self, slot):
+        with self.cond:
+            state = self.slots[slot]
+            if state["process"].is_alive():
+                return
+            code = state["process"].exitcode
+            print(f"[WARN] Worker {slot} exited with code {code}, starting a new one")
+            if state["job"]:
+                self._finish(slot, state["job"], "failed", f"worker exited with code {code}")
+            state["conn"].close()
+            self._spawn(slot)
+            self.cond.notify_all()
+
+    def status(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            out = {k: v for k, v in job.items() if k not in ("path", "clay_dir", "result")}
+            if job["status"] == "queued":
+                out["position"] = list(self.pending).index(job_id) + 1
+            return out
+
+    def result(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            return job.get("result") if job else None
+
+    def statuses(self):
+        with self.cond:
+            ids = list(self.jobs)
+        return [self.status(job_id) for job_id in ids]
+
+    def metrics(self, window=600.0):
+        """Queue depth, worker use, and per-stage latency and throughput of
+        the packs finished in the last `window` seconds."""
+        now = time.time()
+        with self.cond:
+            recent = [j for j in self.finished if j["finished"] >= now - window]
+            out = {
+                "uptime": now - self.started,
+                "workers": len(self.slots),
+                "ready_workers": sum(1 for s in self.slots if s["ready"]),
+                "busy_workers": sum(1 for s in self.slots if s["job"]),
+                "queue_depth": len(self.pending),
+                "jobs": dict(self.counts),
+            }
+        done = [j for j in recent if j["status"] == "done"]
+        span = min(window, now - self.started)
+        out["window"] = span
+        out["throughput_per_min"] = len(done) / span * 60 if span else 0.0
+        series = {stage: [j["result"]["timings"][stage] for j in done] for stage in STAGES}
+        series["queue_wait"] = [j["started"] - j["submitted"] for j in recent]
+        series["turnaround"] = [j["finished"] - j["submitted"] for j in recent]
+        out["latency"] = {name: {"p50": percentile(v, 50), "p90": percentile(v, 90), "max": max(v, default=0.0)}
+                          for name, v in series.items()}
+        return out
+
+    def close(self):
+        with self.cond:
+            self.closing = True
+            self.cond.notify_all()
+        for state in self.slots:
+            try:
+                state["conn"].send(None)
+            except OSError:
+                pass
+        for state in self.slots:
+            state["process"].join()
+        for thread in self._threads:
+            thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length)
+        if url.path.rstrip("/") != "/jobs":
+            return self._reply(404, {"error": "not found"})
+        if not data:
+            return self._reply(400, {"error": "send the pack as the request body"})
+        query = parse_qs(url.query)
+        try:
+            job = self.server.service.submit(query.get("name", ["pack.zip"])[0], data,
+                                             query.get("clay_dir", [None])[0])
+        except ValueError as e:
+            return self._reply(400, {"error": str(e)})
+        self._reply(202, job)
+
+    def do_GET(self):
+        service = self.server.service
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if parts == ["metrics"]:
+            return self._reply(200, service.metrics())
+        if parts == ["jobs"]:
+            return self._reply(200, service.statuses())
+        if parts[0] != "jobs" or len(parts) not in (2, 3) or len(parts) == 3 and parts[2] != "result":
+            return self._reply(404, {"error": "not found"})
+        job = service.status(parts[1])
+        if job is None:
+            return self._reply(404, {"error": f"unknown job {parts[1]}"})
+        if len(parts) == 2:
+            return self._reply(200, job)
+        if job["status"] != "done":
+            return self._reply(409, job)
+        self._reply(200, service.result(parts[1]))
+
+
+if hasattr(socket, "AF_UNIX"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    # Windows: --socket falls back to host:port
+    _UnixServer = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep converters warm and take packs over a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of host:port (not on Windows)")
+    parser.add_argument("--workers", type=int, default=2, help="packs converted at the same time")
+    parser.add_argument("--workspace", default=BASE_DIR / "workspaces",
+                        help="folder for the workers' files and submitted packs")
+    parser.add_argument("--keep", type=int, default=1000, help="finished jobs to remember")
+    args = parser.parse_args()
+
+    load_config()
+    service = Daemon(workers=args.workers, workspace=args.workspace, keep=args.keep).start()
+    if args.socket and _UnixServer is None:
+        print("[WARN] Unix sockets are not available here, listening on host:port instead")
+        args.socket = None
+    if args.socket:
+        Path(args.socket).unlink(missing_ok=True)
+        server = _UnixServer(args.socket, _Handler)
+        where = f"unix:{args.socket}"
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), _Handler)
+        where = f"http://{args.host}:{server.server_address[1]}"
+    server.service = service
+    print(f"[OK] AutoPack daemon listening on {where} with {args.workers} workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket:
+            Path(args.socket).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
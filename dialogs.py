@@ -0,0 +1,30 @@
+# tkinter is imported on first use, so headless runs (batch, watch) never load it
+
+
+def pick_zip_file():
+    import tkinter as tk
+    from tkinter import filedialog
+    root = tk.Tk()
+    root.withdraw()
+    root.wm_attributes("-topmost", 1)
+    fp = filedialog.askopenfilename(
+        title="Select your texture pack (.zip or .mcpack)",
+        filetypes=[
+            ("Texture Packs", "*.zip *.mcpack"),
+            ("Zip Files", "*.zip"),
+            ("MCPACK Files", "*.mcpack"),
+        ],
+    )
+    root.destroy()
+    return fp
+
+
+def pick_clay_folder():
+    import tkinter as tk
+    from tkinter import filedialog
+    root = tk.Tk()
+    root.withdraw()
+    root.wm_attributes("-topmost", 1)
+    folder = filedialog.askdirectory(title="Locate clay textures (terracotta/hardened clay)")
+    root.destroy()
+    return folder
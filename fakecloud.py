@@ -0,0 +1,205 @@
+import argparse
+import http.server
+import itertools
+import json
+import random
+import threading
+import time
+
+
+class FakeCloud(http.server.ThreadingHTTPServer):
+    """Local stand-in for the Open Cloud assets API, for testing uploads
+    without an API key or quota.
+
+    Serves POST /assets/v1/assets and GET /assets/v1/operations/{id}. Every
+    request takes `latency` (+ up to `jitter`) seconds, an operation is done
+    `completion_delay` seconds after its POST, and a fraction of requests
+    fail with 429 (with Retry-After) or 503. At most max_connections
+    connections are served at once (None = no limit); the rest wait to be
+    accepted, like on a saturated server.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, completion_delay=0.5,
+                 rate_429=0.0, rate_503=0.0, retry_after=1, max_connections=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.completion_delay = completion_delay
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.slots = threading.BoundedSemaphore(max_connections) if max_connections else None
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.operations = {}
+        self.counts = {"POST": 0, "GET": 0, "bytes_in": 0, "connections": 0, "peak_connections": 0}
+        self.statuses = {}
+        self._active = 0
+        self._thread = None
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever, name="fakecloud", daemon=True)
+            self._thread.start()
+        return self
+
+    def process_request(self, request, client_address):
+        # runs on the accept loop, so a full server stops accepting
+        if self.slots:
+            self.slots.acquire()
+        with self.lock:
+            self._active += 1
+            self.counts["connections"] += 1
+            self.counts["peak_connections"] = max(self.counts["peak_connections"], self._active)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        super().shutdown_request(request)
+        with self.lock:
+            self._active -= 1
+        if self.slots:
+            self.slots.release()
+
+    def count(self, method, status, size=0):
+        with self.lock:
+            self.counts[method] += 1
+            self.counts["bytes_in"] += size
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def failure(self):
+        # the status to fail this request with, if any
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.rate_503:
+            return 503
+        return None
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts, statuses=dict(sorted(self.statuses.items())),
+                        operations=len(self.operations))
+
+    def close(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # drop idle keep-alive connections so they do not hold a slot forever
+    timeout = 5
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, obj, method, size=0, headers=()):
+        self.server.count(method, status, size)
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay(self):
+        server = self.server
+        wait = server.latency + (server.rng.random() * server.jitter if server.jitter else 0.0)
+        if wait:
+            time.sleep(wait)
+
+    def _fail(self, method, size=0):
+        status = self.server.failure()
+        if status == 429:
+            self._reply(429, {"message": "Too many requests"}, method, size,
+                        [("Retry-After", str(self.server.retry_after))])
+        elif status == 503:
+            self._reply(503, {"message": "Service unavailable"}, method, size)
+        return status is not None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._delay()
+        if self.path != "/assets/v1/assets":
+            return self._reply(404, {"message": "Not found"}, "POST", len(body))
+        if not self.headers.get("x-api-key"):
+            return self._reply(401, {"message": "Missing x-api-key"}, "POST", len(body))
+        if b'name="request"' not in body or b'name="fileContent"' not in body:
+            return self._reply(400, {"message": "Expected request and fileContent parts"}, "POST", len(body))
+        if self._fail("POST", len(body)):
+            return
+
+        op_id = f"{next(self.server.ids):08x}-fake"
+        with self.server.lock:
+            self.server.operations[op_id] = time.monotonic() + self.server.completion_delay
+        self._reply(200, {"path": f"operations/{op_id}", "operationId": op_id, "done": False},
+                    "POST", len(body))
+
+    def do_GET(self):
+        self._delay()
+        prefix = "/assets/v1/operations/"
+        op_id = self.path[len(prefix):] if self.path.startswith(prefix) else None
+        with self.server.lock:
+            ready_at = self.server.operations.get(op_id)
+        if ready_at is None:
+            return self._reply(404, {"message": "Operation not found"}, "GET")
+        if self._fail("GET"):
+            return
+
+        if time.monotonic() < ready_at:
+            return self._reply(200, {"path": f"operations/{op_id}", "operationId": op_id, "done": False}, "GET")
+        asset_id = str(int(op_id.split("-")[0], 16) + 100000000)
+        self._reply(200, {
+            "path": f"operations/{op_id}",
+            "operationId": op_id,
+            "done": True,
+            "response": {"@type": "type.googleapis.com/roblox.open_cloud.assets.v1.Asset", "assetId": asset_id},
+        }, "GET")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Open Cloud assets API for upload testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every request takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per request")
+    parser.add_argument("--completion-delay", type=float, default=0.5, help="seconds until an operation is done")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate-503", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--max-connections", type=int, help="connections served at once")
+    args = parser.parse_args()
+
+    server = FakeCloud(args.host, args.port, args.latency, args.jitter, args.completion_delay,
+                       args.rate_429, args.rate_503, args.retry_after, args.max_connections)
+    print(f"[OK] Fake Open Cloud at {server.url} (set UPLOAD_BASE_URL to this in config.py)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# binary FBX 7.4, laid out the way Blender's exporter writes it. The file id,
+# creation time and footer id are the fixed values Blender uses so the
+# FBX SDK accepts the footer without a real timestamp checksum.
+FBX_VERSION = 7400
+_HEAD_MAGIC = b"Kaydara FBX Binary\x20\x20\x00\x1a\x00"
+_SENTINEL = b"\x00" * 13
+_TIME_ID = "1970-01-01 10:00:00:000"
+_FILE_ID = b"\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1"
+_FOOT_ID = b"\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e"
+_FOOT_MAGIC = b"\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b"
+
+_SCALARS = {"C": "<?", "Y": "<h", "I": "<i", "L": "<q", "F": "<f", "D": "<d"}
+_ARRAYS = {"b": "<?", "i": "<i4", "l": "<i8", "f": "<f4", "d": "<f8"}
+
+
+class _Elem:
+    def __init__(self, name, *props):
+        self.name = name.encode("ascii")
+        self.props = list(props)
+        self.children = []
+
+    def add(self, name, *props):
+        child = _Elem(name, *props)
+        self.children.append(child)
+        return child
+
+    def props70(self, *entries):
+        p70 = self.add("Properties70")
+        for name, typ, label, flags, *values in entries:
+            p70.add("P", ("S", name), ("S", typ), ("S", label), ("S", flags), *values)
+        return p70
+
+    def _props_bytes(self):
+        out = bytearray()
+        for code, value in self.props:
+            out += code.encode("ascii")
+            if code in _SCALARS:
+                out += struct.pack(_SCALARS[code], value)
+            elif code in ("S", "R"):
+                data = value.encode("utf-8") if isinstance(value, str) else bytes(value)
+                out += struct.pack("<I", len(data)) + data
+            else:
+                data = np.ascontiguousarray(value, dtype=_ARRAYS[code]).ravel()
+                raw = data.tobytes()
+                encoding = 0
+                if len(raw) > 128:
+                    raw = zlib.compress(raw, 1)
+                    encoding = 1
+                out += struct.pack("<III", data.size, encoding, len(raw)) + raw
+        return bytes(out)
+
+    def write(self, buf):
+        start = len(buf)
+        props = self._props_bytes()
+        buf += struct.pack("<III", 0, len(self.props), len(props))
+        buf += struct.pack("<B", len(self.name)) + self.name + props
+        if self.children:
+            for child in self.children:
+                child.write(buf)
+            buf += _SENTINEL
+        struct.pack_into("<I", buf, start, len(buf))
+
+
+def _name(name, cls):
+    return ("S", f"{name}\x00\x01{cls}")
+
+
+def _header(root):
+    ext = root.add("FBXHeaderExtension")
+    ext.add("FBXHeaderVersion", ("I", 1003))
+    ext.add("FBXVersion", ("I", FBX_VERSION))
+    ext.add("EncryptionType", ("I", 0))
+    stamp = ext.add("CreationTimeStamp")
+    for key, value in (("Version", 1000), ("Year", 1970), ("Month", 1), ("Day", 1),
+                       ("Hour", 10), ("Minute", 0), ("Second", 0), ("Millisecond", 0)):
+        stamp.add(key, ("I", value))
+    ext.add("Creator", ("S", "AutoPack"))
+    root.add("FileId", ("R", _FILE_ID))
+    root.add("CreationTime", ("S", _TIME_ID))
+    root.add("Creator", ("S", "AutoPack"))
+
+    settings = root.add("GlobalSettings")
+    settings.add("Version", ("I", 1000))
+    # Y up, Z front, right handed, centimetres: the axes Blender exports to
+    settings.props70(
+        ("UpAxis", "int", "Integer", "", ("I", 1)),
+        ("UpAxisSign", "int", "Integer", "", ("I", 1)),
+        ("FrontAxis", "int", "Integer", "", ("I", 2)),
+        ("FrontAxisSign", "int", "Integer", "", ("I", 1)),
+        ("CoordAxis", "int", "Integer", "", ("I", 0)),
+        ("CoordAxisSign", "int", "Integer", "", ("I", 1)),
+        ("OriginalUpAxis", "int", "Integer", "", ("I", 2)),
+        ("OriginalUpAxisSign", "int", "Integer", "", ("I", 1)),
+        ("UnitScaleFactor", "double", "Number", "", ("D", 1.0)),
+        ("OriginalUnitScaleFactor", "double", "Number", "", ("D", 1.0)),
+        ("AmbientColor", "ColorRGB", "Color", "", ("D", 0.0), ("D", 0.0), ("D", 0.0)),
+        ("DefaultCamera", "KString", "", "", ("S", "Producer Perspective")),
+        ("TimeMode", "enum", "", "", ("I", 11)),
+        ("TimeSpanStart", "KTime", "Time", "", ("L", 0)),
+        ("TimeSpanStop", "KTime", "Time", "", ("L", 46186158000)),
+        ("CustomFrameRate", "double", "Number", "", ("D", 24.0)),
+    )
+
+
+def encode_mesh(name, positions, polygons, normals, uvs, texture_path=None,
+                material_name="PixelArtMaterial"):
+    """Encode a single textured mesh object as binary FBX bytes.
+
+    positions are control points, polygons lists of indices into them, and
+    normals/uvs one entry per polygon corner in polygon order.
+    """
+    ids = iter(range(1000000, 2000000))
+    doc_id, geom_id, model_id, mat_id, tex_id, video_id = (next(ids) for _ in range(6))
+
+    poly_index = []
+    for poly in polygons:
+        poly_index.extend(poly[:-1])
+        poly_index.append(~poly[-1])
+
+    root = _Elem("")
+    _header(root)
+
+    docs = root.add("Documents")
+    docs.add("Count", ("I", 1))
+    doc = docs.add("Document", ("L", doc_id), ("S", "Scene"), ("S", "Scene"))
+    doc.props70(
+        ("SourceObject", "object", "", ""),
+        ("ActiveAnimStackName", "KString", "", "", ("S", "")),
+    )
+    doc.add("RootNode", ("L", 0))
+    root.add("References")
+
+    defs = root.add("Definitions")
+    defs.add("Version", ("I", 100))
+    types = [("GlobalSettings", 1), ("Model", 1), ("Geometry", 1), ("Material", 1)]
+    if texture_path:
+        types += [("Texture", 1), ("Video", 1)]
+    defs.add("Count", ("I", sum(c for _, c in types)))
+    for typ, count in types:
+        defs.add("ObjectType", ("S", typ)).add("Count", ("I", count))
+
+    objs = root.add("Objects")
+
+    geom = objs.add("Geometry", ("L", geom_id), _name(name, "Geometry"), ("S", "Mesh"))
+    geom.add("Properties70")
+    geom.add("GeometryVersion", ("I", 124))
+    geom.add("Vertices", ("d", positions))
+    geom.add("PolygonVertexIndex", ("i", poly_index))
+
+    layer_normal = geom.add("LayerElementNormal", ("I", 0))
+    layer_normal.add("Version", ("I", 101))
+    layer_normal.add("Name", ("S", ""))
+    layer_normal.add("MappingInformationType", ("S", "ByPolygonVertex"))
+    layer_normal.add("ReferenceInformationType", ("S", "Direct"))
+    layer_normal.add("Normals", ("d", normals))
+
+    layer_uv = geom.add("LayerElementUV", ("I", 0))
+    layer_uv.add("Version", ("I", 101))
+    layer_uv.add("Name", ("S", "UVMap"))
+    layer_uv.add("MappingInformationType", ("S", "ByPolygonVertex"))
+    layer_uv.add("ReferenceInformationType", ("S", "IndexToDirect"))
+    layer_uv.add("UV", ("d", uvs))
+    layer_uv.add("UVIndex", ("i", np.arange(len(uvs), dtype=np.int32)))
+
+    layer_mat = geom.add("LayerElementMaterial", ("I", 0))
+    layer_mat.add("Version", ("I", 101))
+    layer_mat.add("Name", ("S", ""))
+    layer_mat.add("MappingInformationType", ("S", "AllSame"))
+    layer_mat.add("ReferenceInformationType", ("S", "IndexToDirect"))
+    layer_mat.add("Materials", ("i", [0]))
+
+    layer = geom.add("Layer", ("I", 0))
+    layer.add("Version", ("I", 100))
+    for typ in ("LayerElementNormal", "LayerElementUV", "LayerElementMaterial"):
+        le = layer.add("LayerElement")
+        le.add("Type", ("S", typ))
+        le.add("TypedIndex", ("I", 0))
+
+    model = objs.add("Model", ("L", model_id), _name(name, "Model"), ("S", "Mesh"))
+    model.add("Version", ("I", 232))
+    model.props70(
+        ("Lcl Translation", "Lcl Translation", "", "A", ("D", 0.0), ("D", 0.0), ("D", 0.0)),
+        ("Lcl Rotation", "Lcl Rotation", "", "A", ("D", 0.0), ("D", 0.0), ("D", 0.0)),
+        ("Lcl Scaling", "Lcl Scaling", "", "A", ("D", 1.0), ("D", 1.0), ("D", 1.0)),
+        ("DefaultAttributeIndex", "int", "Integer", "", ("I", 0)),
+        ("InheritType", "enum", "", "", ("I", 1)),
+    )
+    model.add("MultiLayer", ("I", 0))
+    model.add("MultiTake", ("I", 0))
+    model.add("Shading", ("C", True))
+    model.add("Culling", ("S", "CullingOff"))
+
+    mat = objs.add("Material", ("L", mat_id), _name(material_name, "Material"), ("S", ""))
+    mat.add("Version", ("I", 102))
+    mat.add("ShadingModel", ("S", "Phong"))
+    mat.add("MultiLayer", ("I", 0))
+    mat.props70(
+        ("DiffuseColor", "Color", "", "A", ("D", 0.8), ("D", 0.8), ("D", 0.8)),
+        ("DiffuseFactor", "Number", "", "A", ("D", 1.0)),
+        ("SpecularFactor", "Number", "", "A", ("D", 0.0)),
+        ("Shininess", "Number", "", "A", ("D", 20.0)),
+        ("Opacity", "double", "Number", "", ("D", 1.0)),
+    )
+
+    conns = root.add("Connections")
+    conns.add("C", ("S", "OO"), ("L", model_id), ("L", 0))
+    conns.add("C", ("S", "OO"), ("L", geom_id), ("L", model_id))
+    conns.add("C", ("S", "OO"), ("L", mat_id), ("L", model_id))
+
+    if texture_path:
+        # only the file name: the texture travels next to the mesh, and an
+        # absolute path would make the bytes depend on the output folder
+        rel_file = Path(texture_path).name
+        video = objs.add("Video", ("L", video_id), _name(rel_file, "Video"), ("S", "Clip"))
+        video.add("Type", ("S", "Clip"))
+        video.props70(("Path", "KString", "XRefUrl", "", ("S", rel_file)))
+        video.add("UseMipMap", ("I", 0))
+        video.add("Filename", ("S", rel_file))
+        video.add("RelativeFilename", ("S", rel_file))
+
+        tex = objs.add("Texture", ("L", tex_id), _name(rel_file, "Texture"), ("S", ""))
+        tex.add("Type", ("S", "TextureVideoClip"))
+        tex.add("Version", ("I", 202))
+        tex.add("TextureName", _name(rel_file, "Texture"))
+        tex.props70(("UseMaterial", "bool", "", "", ("I", 1)))
+        tex.add("Media", _name(rel_file, "Video"))
+        tex.add("FileName", ("S", rel_file))
+        tex.add("RelativeFilename", ("S", rel_file))
+        tex.add("ModelUVTranslation", ("D", 0.0), ("D", 0.0))
+        tex.add("ModelUVScaling", ("D", 1.0), ("D", 1.0))
+        tex.add("Texture_Alpha_Source", ("S", "None"))
+        tex.add("Cropping", ("I", 0), ("I", 0), ("I", 0), ("I", 0))
+
+        conns.add("C", ("S", "OP"), ("L", tex_id), ("L", mat_id), ("S", "DiffuseColor"))
+        conns.add("C", ("S", "OO"), ("L", video_id), ("L", tex_id))
+
+    takes = root.add("Takes")
+    takes.add("Current", ("S", ""))
+
+    buf = bytearray(_HEAD_MAGIC)
+    buf += struct.pack("<I", FBX_VERSION)
+    for elem in root.children:
+        elem.write(buf)
+    buf += _SENTINEL
+    buf += _FOOT_ID + b"\x00" * 4
+    pad = ((len(buf) + 15) & ~15) - len(buf)
+    buf += b"\x00" * (pad or 16)
+    buf += struct.pack("<I", FBX_VERSION)
+    buf += b"\x00" * 120
+    buf += _FOOT_MAGIC
+
+    return bytes(buf)
+
+
+def write_mesh(path, name, positions, polygons, normals, uvs, texture_path=None,
+               material_name="PixelArtMaterial"):
+    path = Path(path)
+    path.write_bytes(encode_mesh(name, positions, polygons, normals, uvs, texture_path, material_name))
+    return str(path)
@@ -0,0 +1,343 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+MESH_MODES = ("pixel", "merged")
+
+
+def _opaque_mask(img):
+    return np.asarray(img.getchannel("A")) > 0
+
+
+def _alpha_grid(img):
+    return _opaque_mask(img).tolist()
+
+
+def opaque_count(img):
+    # how many pixels get a quad in pixel mode
+    return int(np.count_nonzero(_opaque_mask(img.convert("RGBA"))))
+
+
+def pixel_quads(img):
+    """One quad with four unshared vertices per opaque pixel.
+
+    Returns (verts, faces, uvs) as float64 (4n, 3), int32 (n, 4) and float64
+    (4n, 2) arrays, in row-major pixel order and with the exact values of
+    pixel_quads_reference.
+    """
+    res = img.size[0]
+    pixel_size = 2.0 / float(res)
+    x_off = res / 2.0
+    y_off = res / 2.0
+
+    y, x = np.nonzero(_opaque_mask(img))
+    # corners clockwise from the top left of each pixel
+    cx = (x[:, None] + np.array([0, 1, 1, 0])).ravel()
+    cy = (y[:, None] + np.array([0, 0, 1, 1])).ravel()
+
+    verts = np.zeros((len(cx), 3))
+    verts[:, 0] = (cx - x_off) * pixel_size
+    verts[:, 1] = (y_off - cy) * pixel_size
+    faces = np.arange(len(cx), dtype=np.int32).reshape(-1, 4)
+    uvs = np.empty((len(cx), 2))
+    uvs[:, 0] = cx / res
+    uvs[:, 1] = (res - cy) / res
+    return verts, faces, uvs
+
+
+def pixel_quads_reference(img):
+    # original per-pixel loop, kept to check pixel_quads against
+    res = img.size[0]
+    pixel_size = 2.0 / float(res)
+    pixels = img.load()
+
+    verts = []
+    faces = []
+    uvs = []
+
+    x_off = res / 2.0
+    y_off = res / 2.0
+
+    for y in range(res):
+        for x in range(res):
+            r, g, b, a = pixels[x, y]
+            if a <= 0:
+                continue
+
+            z = 0.0
+
+            v1 = ((x - x_off) * pixel_size, (y_off - y) * pixel_size, z)
+            v2 = ((x + 1 - x_off) * pixel_size, (y_off - y) * pixel_size, z)
+            v3 = ((x + 1 - x_off) * pixel_size, (y_off - (y + 1)) * pixel_size, z)
+            v4 = ((x - x_off) * pixel_size, (y_off - (y + 1)) * pixel_size, z)
+
+            base_idx = len(verts)
+            verts.extend([v1, v2, v3, v4])
+            faces.append([base_idx, base_idx + 1, base_idx + 2, base_idx + 3])
+
+            uv1 = (x / res, (res - y) / res)
+            uv2 = ((x + 1) / res, (res - y) / res)
+            uv3 = ((x + 1) / res, (res - (y + 1)) / res)
+            uv4 = (x / res, (res - (y + 1)) / res)
+
+            uvs.extend([uv1, uv2, uv3, uv4])
+
+    return verts, faces, uvs
+
+
+def _greedy_rects(opaque):
+    # grow each rect right first, then down while the whole span stays opaque
+    h = len(opaque)
+    w = len(opaque[0]) if h else 0
+    used = [[False] * w for _ in range(h)]
+    rects = []
+    for y in range(h):
+        row = opaque[y]
+        urow = used[y]
+        x = 0
+        while x < w:
+            if not row[x] or urow[x]:
+                x += 1
+                continue
+            x1 = x + 1
+            while x1 < w and row[x1] and not urow[x1]:
+                x1 += 1
+            y1 = y + 1
+            while y1 < h:
+                nrow = opaque[y1]
+                nused = used[y1]
+                if all(nrow[i] and not nused[i] for i in range(x, x1)):
+                    y1 += 1
+                else:
+                    break
+            for yy in range(y, y1):
+                used[yy][x:x1] = [True] * (x1 - x)
+            rects.append((x, y, x1, y1))
+            x = x1
+    return rects
+
+
+def _split_t_junctions(polygons):
+    """Add to every polygon edge the corners of others that lie inside it.
+
+    Greedy rectangles only share corners where their edges line up; a long
+    edge next to several short ones would leave T-junctions that crack and
+    seam once triangulated. polygons are lists of (key, uv) corners with
+    keys (gx, gy, layer), and edges only meet within one layer. UVs of the
+    added corners are interpolated along the edge.
+    """
+    rows, cols = {}, {}
+    for key in {key for corners in polygons for key, _ in corners}:
+        gx, gy, layer = key
+        rows.setdefault((gy, layer), []).append(gx)
+        cols.setdefault((gx, layer), []).append(gy)
+    for line in (*rows.values(), *cols.values()):
+        line.sort()
+
+    out = []
+    for corners in polygons:
+        split = []
+        for (a, ua), (b, ub) in zip(corners, corners[1:] + corners[:1]):
+            split.append((a, ua))
+            if a[2] != b[2]:
+                continue
+            if a[1] == b[1]:
+                axis, line = 0, rows[(a[1], a[2])]
+            elif a[0] == b[0]:
+                axis, line = 1, cols[(a[0], a[2])]
+            else:
+                continue
+            lo, hi = a[axis], b[axis]
+            inside = line[bisect_right(line, min(lo, hi)):bisect_left(line, max(lo, hi))]
+            for t in inside if lo < hi else inside[::-1]:
+                f = (t - lo) / (hi - lo)
+                key = (t, a[1], a[2]) if axis == 0 else (a[0], t, a[2])
+                split.append((key, (ua[0] + (ub[0] - ua[0]) * f, ua[1] + (ub[1] - ua[1]) * f)))
+        out.append(split)
+    return out
+
+
+def merged_quads(img):
+    """Greedy-merge opaque pixels into rectangles that share their corners.
+
+    UVs stay a linear function of position, so with closest-texel sampling
+    every merged quad still shows the exact source pixels. A rectangle gets
+    more than four corners where a neighbour's corner lies on its edge.
+    """
+    res = img.size[0]
+    pixel_size = 2.0 / float(res)
+    x_off = res / 2.0
+    y_off = res / 2.0
+
+    verts = []
+    faces = []
+    uvs = []
+    index = {}
+
+    def corner(key, uv):
+        gx, gy, _ = key
+        i = index.get((gx, gy))
+        if i is None:
+            i = index[(gx, gy)] = len(verts)
+            verts.append(((gx - x_off) * pixel_size, (y_off - gy) * pixel_size, 0.0))
+        uvs.append(uv)
+        return i
+
+    rects = [[(gx, gy, 0) for gx, gy in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+             for x0, y0, x1, y1 in _greedy_rects(_alpha_grid(img))]
+    polygons = _split_t_junctions([[(k, (k[0] / res, (res - k[1]) / res)) for k in rect] for rect in rects])
+    for corners in polygons:
+        faces.append([corner(key, uv) for key, uv in corners])
+
+    return verts, faces, uvs
+
+
+def build_quads(img, mode="pixel"):
+    if mode == "pixel":
+        return pixel_quads(img)
+    if mode == "merged":
+        return merged_quads(img)
+    raise ValueError(f"Unknown mesh mode: {mode}")
+
+
+def mesh_stats(verts, faces, uvs):
+    """Face/vertex counts before and after Solidify, plus approximate FBX bytes.
+
+    Solidify doubles the shell and adds a two-triangle-wide rim wall along
+    every boundary edge. The byte figure counts the arrays the FBX exporter
+    writes (double positions, int32 polygon indices, double normals,
+    tangents, binormals and UVs per loop) and ignores headers and compression.
+    """
+    if isinstance(faces, np.ndarray):
+        faces = faces.tolist()
+    edges = {}
+    for f in faces:
+        for i in range(len(f)):
+            e = (f[i], f[(i + 1) % len(f)])
+            e = (min(e), max(e))
+            edges[e] = edges.get(e, 0) + 1
+    boundary = sum(1 for c in edges.values() if c == 1)
+
+    loops = sum(len(f) for f in faces)
+    solid_verts = len(verts) * 2
+    solid_faces = len(faces) * 2 + boundary
+    solid_loops = loops * 2 + boundary * 4
+    approx_bytes = solid_verts * 3 * 8 + solid_loops * (4 + 3 * 8 * 3 + 2 * 8 + 4)
+    return {
+        "faces": len(faces),
+        "verts": len(verts),
+        "loops": loops,
+        "boundary_edges": boundary,
+        "solid_faces": solid_faces,
+        "solid_verts": solid_verts,
+        "approx_bytes": approx_bytes,
+    }
+
+
+def _rim_runs(opaque, merge):
+    # exposed pixel sides as (side, pixel row/column, grid line, start, end)
+    h = len(opaque)
+    w = len(opaque[0]) if h else 0
+
+    def solid(x, y):
+        return 0 <= x < w and 0 <= y < h and opaque[y][x]
+
+    runs = []
+    for side, (dx, dy) in (("top", (0, -1)), ("bottom", (0, 1)), ("left", (-1, 0)), ("right", (1, 0))):
+        horizontal = dx == 0
+        outer = h if horizontal else w
+        inner = w if horizontal else h
+        for a in range(outer):
+            line = a + 1 if side in ("bottom", "right") else a
+            start = None
+            for b in range(inner + 1):
+                x, y = (b, a) if horizontal else (a, b)
+                exposed = b < inner and solid(x, y) and not solid(x + dx, y + dy)
+                if start is not None and (not exposed or not merge):
+                    runs.append((side, a, line, start, b))
+                    start = None
+                if exposed and start is None:
+                    start = b
+    return runs
+
+
+def solidify(img, mode="pixel", thickness=0.13):
+    """Extruded item geometry without Blender.
+
+    The quads face +Z at z=0, a back copy faces -Z at z=-thickness, and walls
+    run only along the silhouette of the opaque pixels. That matches the bpy
+    backend's Solidify modifier in merged mode; in pixel mode bpy's quads
+    share no vertices, so Solidify walls in every pixel and its mesh has
+    many more faces, though the visible surface is the same.
+
+    Returns (positions, polygons, normals, uvs) with normals and UVs per
+    polygon corner, in the same frame as build_quads (the image centred on the origin, whatever
+    the silhouette), since bpy's origin_set plus transform_apply leaves the
+    vertices where they were.
+    """
+    if mode not in MESH_MODES:
+        raise ValueError(f"Unknown mesh mode: {mode}")
+    res = img.size[0]
+    pixel_size = 2.0 / float(res)
+    half = res / 2.0
+    opaque = _alpha_grid(img)
+
+    positions = []
+    index = {}
+
+    def point(gx, gy, back):
+        key = (gx, gy, back)
+        i = index.get(key)
+        if i is None:
+            i = index[key] = len(positions)
+            positions.append(((gx - half) * pixel_size, (half - gy) * pixel_size, -thickness if back else 0.0))
+        return i
+
+    faces = []
+
+    def emit(corners, normal, corner_uvs):
+        faces.append((list(zip(corners, corner_uvs)), normal))
+
+    rects = _greedy_rects(opaque) if mode == "merged" else [
+        (x, y, x + 1, y + 1) for y in range(res) for x in range(res) if opaque[y][x]
+    ]
+
+    def uv(gx, gy):
+        return (gx / res, (res - gy) / res)
+
+    for x0, y0, x1, y1 in rects:
+        front = [(x0, y0), (x0, y1), (x1, y1), (x1, y0)]
+        emit([(gx, gy, False) for gx, gy in front], (0.0, 0.0, 1.0), [uv(gx, gy) for gx, gy in front])
+        back = front[::-1]
+        emit([(gx, gy, True) for gx, gy in back], (0.0, 0.0, -1.0), [uv(gx, gy) for gx, gy in back])
+
+    for side, row, line, start, end in _rim_runs(opaque, merge=(mode == "merged")):
+        # walk each wall so the outside is on the right, then sample the
+        # texel row/column just inside the silhouette
+        if side == "top":
+            p, q, normal = (end, line), (start, line), (0.0, 1.0, 0.0)
+            tp, tq = (end, row + 0.5), (start, row + 0.5)
+        elif side == "bottom":
+            p, q, normal = (start, line), (end, line), (0.0, -1.0, 0.0)
+            tp, tq = (start, row + 0.5), (end, row + 0.5)
+        elif side == "left":
+            p, q, normal = (line, start), (line, end), (-1.0, 0.0, 0.0)
+            tp, tq = (row + 0.5, start), (row + 0.5, end)
+        else:
+            p, q, normal = (line, end), (line, start), (1.0, 0.0, 0.0)
+            tp, tq = (row + 0.5, end), (row + 0.5, start)
+        corners = [(*p, False), (*p, True), (*q, True), (*q, False)]
+        emit(corners, normal, [uv(*tp), uv(*tp), uv(*tq), uv(*tq)])
+
+    if mode == "merged":
+        split = _split_t_junctions([corners for corners, _ in faces])
+        faces = [(corners, normal) for corners, (_, normal) in zip(split, faces)]
+    polygons = []
+    normals = []
+    uvs = []
+    for corners, normal in faces:
+        polygons.append([point(*key) for key, _ in corners])
+        normals.extend([normal] * len(corners))
+        uvs.extend(uv for _, uv in corners)
+
+    return positions, polygons, normals, uvs
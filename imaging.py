@@ -0,0 +1,91 @@
+import io
+import numpy as np
+from PIL import Image
+from bleed import edge_expand
+from tracing import span
+
+# palette images are small enough for zlib's slowest level to pay off
+PALETTE_LEVEL = 9
+# for truecolor images level 7 is a few percent smaller than PIL's default 6
+# for ~1.5x the time; level 9 gets ~10% at 512x but costs ~15x
+TRUECOLOR_LEVEL = 7
+# what optimize="exhaustive" saves truecolor images with, keeping the smallest
+EXHAUSTIVE_OPTIONS = ({"compress_level": 9}, {"optimize": True})
+
+
+def _palette(img):
+    # exact palette image for an RGBA image with at most 256 colours, else None
+    counted = img.getcolors(256)
+    if counted is None:
+        return None
+    entries = np.array([c for _, c in counted], dtype=np.uint8)
+    colors = np.sort(entries.view("<u4").ravel())
+    entries = colors.view(np.uint8).reshape(-1, 4)
+    packed = np.ascontiguousarray(np.asarray(img)).view("<u4")[..., 0]
+    pal = Image.fromarray(np.searchsorted(colors, packed).astype(np.uint8), "P")
+    pal.putpalette(entries[:, :3].tobytes())
+    if (entries[:, 3] != 255).any():
+        pal.info["transparency"] = entries[:, 3].tobytes()
+    return pal
+
+
+def smallest_mode(img):
+    """Lossless equivalent of an image in the cheapest PNG colour type:
+    palette (<= 256 colours), RGB (fully opaque) or RGBA."""
+    img = img.convert("RGBA") if img.mode != "RGBA" else img
+    pal = _palette(img)
+    if pal is not None:
+        return pal
+    if img.getextrema()[3][0] == 255:
+        return img.convert("RGB")
+    return img
+
+
+def _save(img, **options):
+    buf = io.BytesIO()
+    img.save(buf, "PNG", **options)
+    return buf.getvalue()
+
+
+def encode_png(img, optimize=True, baseline=False):
+    """PNG bytes of img, in the smallest lossless colour type unless optimize
+    is off; optimize="exhaustive" also tries every EXHAUSTIVE_OPTIONS zlib
+    setting on truecolor images. With baseline, returns (bytes, size with
+    PIL's defaults) so the caller can report what was saved."""
+    default = _save(img) if baseline or not optimize else None
+    if not optimize:
+        data = default
+    else:
+        small = smallest_mode(img)
+        if small.mode == "P":
+            data = _save(small, compress_level=PALETTE_LEVEL)
+        elif optimize == "exhaustive":
+            data = min((_save(small, **options) for options in EXHAUSTIVE_OPTIONS), key=len)
+        else:
+            data = _save(small, compress_level=TRUECOLOR_LEVEL)
+        if default is not None and len(default) < len(data):
+            data = default
+    return (data, len(default)) if baseline else data
+
+
+def resize_512(img, bleed=False):
+    # nearest keeps pixel art crisp; bleed also fills transparent texels
+    if bleed:
+        return edge_expand(img, size=512)
+    return img.resize((512, 512), Image.Resampling.NEAREST)
+
+
+def resize_png(src, bleed=False, optimize=True, baseline=False):
+    """Open a texture (path, file object or PNG bytes) and return it as 512x512 PNG bytes
+    (with the size of PIL's default encoding when baseline is set)."""
+    if isinstance(src, bytes):
+        src = io.BytesIO(src)
+    with span("image.decode") as sp, Image.open(src) as img:
+        img = img.convert("RGBA")
+        sp.set(width=img.width, height=img.height)
+    with span("image.resize", bleed=bleed):
+        img = resize_512(img, bleed)
+    with span("image.encode") as sp:
+        data = encode_png(img, optimize, baseline)
+        sp.set(bytes=len(data[0] if baseline else data))
+    return data
@@ -54,7 +54,7 @@ if errorlevel 1 (
 )
 
 echo.
-echo [1/4] Installing bpy (this may take a while)...
+echo [1/5] Installing bpy (this may take a while)...
 %TARGET_EXE% -m pip install bpy==4.5.4 --pre --extra-index-url https://download.blender.org/pip/
 if errorlevel 1 (
     echo [ERROR] Failed to install bpy
@@ -63,7 +63,7 @@ if errorlevel 1 (
 )
 
 echo.
-echo [2/4] Installing Pillow...
+echo [2/5] Installing Pillow...
 %TARGET_EXE% -m pip install Pillow
 if errorlevel 1 (
     echo [ERROR] Failed to install Pillow
@@ -72,7 +72,7 @@ if errorlevel 1 (
 )
 
 echo.
-echo [3/4] Installing requests...
+echo [3/5] Installing requests...
 %TARGET_EXE% -m pip install requests
 if errorlevel 1 (
     echo [ERROR] Failed to install requests
@@ -81,7 +81,7 @@ if errorlevel 1 (
 )
 
 echo.
-echo [4/4] Installing zstandard...
+echo [4/5] Installing zstandard...
 %TARGET_EXE% -m pip install zstandard
 if errorlevel 1 (
     echo [ERROR] Failed to install zstandard
@@ -89,6 +89,15 @@ if errorlevel 1 (
     exit /b 1
 )
 
+echo.
+echo [5/5] Installing numpy...
+%TARGET_EXE% -m pip install numpy
+if errorlevel 1 (
+    echo [ERROR] Failed to install numpy
+    pause
+    exit /b 1
+)
+
 echo.
 echo [OK] All dependencies installed!
 echo.
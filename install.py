@@ -94,6 +94,7 @@ def install_dependencies(python_exe):
         ([str(python_exe), "-m", "pip", "install", "Pillow"], "Pillow"),
         ([str(python_exe), "-m", "pip", "install", "requests"], "requests"),
         ([str(python_exe), "-m", "pip", "install", "zstandard"], "zstandard"),
+        ([str(python_exe), "-m", "pip", "install", "numpy"], "numpy"),
     ]
     for cmd, name in deps:
         if not run_command(cmd, name, python_exe):
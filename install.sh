@@ -44,30 +44,34 @@ if ls ./bpy-*.whl 1> /dev/null 2>&1; then
     ls bpy-*.whl
     read -p "Use local wheel instead of slow pip download? (y/n): " use_local
     if [[ "$use_local" == "y" || "$use_local" == "Y" ]]; then
-        echo "[1/4] Installing local bpy wheel..."
+        echo "[1/5] Installing local bpy wheel..."
         $PY -m pip install ./bpy-*.whl
         echo "[OK] Installed bpy from local wheel"
     else
-        echo "[1/4] Installing bpy from Blender servers..."
+        echo "[1/5] Installing bpy from Blender servers..."
         $PY -m pip install bpy==4.5.4 --pre --extra-index-url https://download.blender.org/pip/
     fi
 else
-    echo "[1/4] Installing bpy..."
+    echo "[1/5] Installing bpy..."
     $PY -m pip install bpy==4.5.4 --pre --extra-index-url https://download.blender.org/pip/
 fi
 
 echo
-echo "[2/4] Installing Pillow..."
+echo "[2/5] Installing Pillow..."
 $PY -m pip install Pillow
 
 echo
-echo "[3/4] Installing requests..."
+echo "[3/5] Installing requests..."
 $PY -m pip install requests
 
 echo
-echo "[4/4] Installing zstandard..."
+echo "[4/5] Installing zstandard..."
 $PY -m pip install zstandard
 
+echo
+echo "[5/5] Installing numpy..."
+$PY -m pip install numpy
+
 
 echo
 echo "[OK] All dependencies installed!"
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class UploadJournal:
+    """Append-only log of upload jobs that survives crashes.
+
+    Every job (a hash of its input and settings) gets one line when its
+    upload starts, one with the operation id once the POST returned and one
+    with the asset id (or a failure) once the operation is done. Each line is
+    flushed and fsynced before the call returns, and a line torn by a crash
+    is cut off on the next start. The last line of a job wins.
+
+    Lines carry the pack of the run set with begin(). A run that completes
+    drops its pack's jobs again, so the journal only ever holds the jobs
+    of interrupted runs and is no cache of asset ids across packs.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.pack = None
+        lines = self._load()
+        if lines > 2 * len(self.jobs) + 100:
+            self._compact()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not self.path.exists():
+            return 0
+        data = self.path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # torn by a crash: the next line must not be glued onto it
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        lines = data[:end].decode("utf-8", "replace").splitlines()
+        for line in lines:
+            try:
+                rec = json.loads(line)
+                if rec.get("pack"):
+                    self.jobs[rec["job"]] = rec
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+        return len(lines)
+
+    def _compact(self):
+        # keep only the last line of every job
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for rec in self.jobs.values():
+                f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _write(self, job, state, **fields):
+        with self.lock:
+            if self.pack is None:
+                # the run completed; its late callbacks are not kept
+                return
+            rec = {"job": job, "pack": self.pack, "state": state, "time": time.time(), **fields}
+            line = json.dumps(rec) + "\n"
+            self.jobs[job] = rec
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def begin(self, pack):
+        """Start logging the upload jobs of a run of `pack` (a digest)."""
+        with self.lock:
+            self.pack = pack
+
+    def complete(self):
+        """The run finished: forget its jobs, so the next run of the pack
+        uploads (or takes from the asset cache) like any other."""
+        with self.lock:
+            pack, self.pack = self.pack, None
+            if pack is None:
+                return
+            self.jobs = {job: rec for job, rec in self.jobs.items() if rec["pack"] != pack}
+            self._file.close()
+            self._compact()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def started(self, job):
+        self._write(job, "started")
+
+    def posted(self, job, operation_id):
+        self._write(job, "posted", operation=operation_id)
+
+    def finished(self, job, asset_id):
+        self._write(job, "done", asset=str(asset_id))
+
+    def failed(self, job):
+        self._write(job, "failed")
+
+    def asset(self, job):
+        rec = self.jobs.get(job)
+        return rec["asset"] if rec and rec["state"] == "done" else None
+
+    def operation(self, job):
+        # the operation of a job that was posted but never finished
+        rec = self.jobs.get(job)
+        return rec["operation"] if rec and rec["state"] == "posted" else None
+
+    def stats(self):
+        with self.lock:
+            states = [rec["state"] for rec in self.jobs.values()]
+        return {s: states.count(s) for s in ("started", "posted", "done", "failed")}
+
+    def close(self):
+        with self.lock:
+            self._file.close()
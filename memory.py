@@ -0,0 +1,203 @@
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# estimated peak memory of a job in bytes: fixed + per source pixel + per
+# opaque source pixel (one quad each before solidify/Blender copy them),
+# fitted with `python -m benchmarks.memory`
+JOB_COSTS = {
+    "resize": (5_000_000, 8, 0),
+    "resize_bleed": (12_000_000, 60, 0),
+    "mesh_native_pixel": (12_000_000, 60, 2_400),
+    "mesh_native_merged": (12_000_000, 60, 30),
+    # guesses, never measured: Blender keeps its own copy of the geometry
+    "mesh_bpy_pixel": (60_000_000, 60, 4_000),
+    "mesh_bpy_merged": (60_000_000, 60, 300),
+}
+# rows of JOB_COSTS that benchmarks.memory has not fitted yet
+UNMEASURED = {"mesh_bpy_pixel", "mesh_bpy_merged"}
+
+
+def _status(field):
+    # a VmRSS/VmHWM line of /proc/self/status in bytes, None off Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss():
+    value = _status("VmRSS")
+    if value is None and psutil is not None:
+        value = psutil.Process().memory_info().rss
+    return value
+
+
+def peak():
+    """Peak RSS of this process since it started or since reset_peak(),
+    None where neither /proc, psutil nor resource can tell."""
+    value = _status("VmHWM")
+    if value is None and psutil is not None:
+        # peak_wset only exists on Windows
+        value = getattr(psutil.Process().memory_info(), "peak_wset", None)
+    if value is None and resource is not None:
+        # ru_maxrss is in KB on Linux and bytes on macOS, and cannot be reset
+        value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return value
+
+
+def reset_peak():
+    # Linux >= 4.0 resets VmHWM to the current RSS; elsewhere the peak
+    # cannot be reset and jobs keep their JOB_COSTS estimates
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measured(fn, *args):
+    """Run fn in this process and return its result with the peak RSS growth
+    it caused (None where that cannot be measured)."""
+    exact = reset_peak()
+    before = rss()
+    result = fn(*args)
+    if not exact or before is None:
+        return result, None
+    return result, peak() - before
+
+
+def estimate(kind, width, height, opaque=0, costs=JOB_COSTS):
+    fixed, per_pixel, per_opaque = costs[kind]
+    return int(fixed + per_pixel * width * height + per_opaque * opaque)
+
+
+class MemoryBudget:
+    """Admits jobs while the sum of their estimated peak memory fits in budget.
+
+    A job that does not fit waits until enough others finished; one job is
+    always admitted when nothing else runs, however large. Jobs measured
+    while running alone record their exact peak RSS growth and correct the
+    estimates of their kind up or down; jobs that overlapped others only
+    give an upper bound, so they can lower a kind's correction but never
+    raise it. Every measurement is kept in `records`. Where the peak cannot
+    be reset (anywhere but Linux) nothing is measured and the JOB_COSTS
+    estimates are used as they are.
+    """
+
+    def __init__(self, budget=None, costs=JOB_COSTS):
+        self.budget = budget
+        self.costs = costs
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.factors = {}
+        self.records = []
+        self._active = {}
+        # whether the peak can be reset at all, and the estimated kinds
+        # still on their JOB_COSTS guess
+        self._exact = reset_peak()
+        self._guessed = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def estimate(self, kind, width, height, opaque=0):
+        if kind in UNMEASURED and kind not in self.factors:
+            self._guessed.add(kind)
+        base = estimate(kind, width, height, opaque, self.costs)
+        return int(base * self.factors.get(kind, 1.0))
+
+    def admit(self, cost):
+        with self._lock:
+            if self.budget is not None and self.in_use and self.in_use + cost > self.budget:
+                return False
+            self.in_use += cost
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            return True
+
+    def release(self, cost):
+        with self._lock:
+            self.in_use -= cost
+
+    @contextmanager
+    def measure(self, name, kind, cost):
+        """Measure the peak RSS growth of a job running on this thread.
+
+        Set job["skip"] when the work went elsewhere and its peak reaches
+        observe() another way, e.g. from a worker process."""
+        job = {"skip": False, "shared": False, "peak": None, "rss": None}
+        with self._lock:
+            if self._active:
+                job["shared"] = True
+                for other in self._active.values():
+                    other["shared"] = True
+                job["rss"] = rss() if self._exact else None
+            elif self._exact and reset_peak():
+                job["rss"] = rss()
+            self._active[id(job)] = job
+        self._local.job = job
+        try:
+            yield job
+        finally:
+            self._local.job = None
+            with self._lock:
+                del self._active[id(job)]
+                grown = None
+                if job["rss"] is not None:
+                    grown = peak() - job["rss"]
+            if job["peak"] is not None:
+                grown = job["peak"]
+            if not job["skip"] and grown is not None:
+                self.observe(name, kind, cost, grown, job["shared"])
+
+    def report(self, grown):
+        """Replace the measurement of the job on this thread with the exact
+        peak its work had in another process (see measured())."""
+        job = getattr(self._local, "job", None)
+        if job is not None and grown is not None:
+            job["peak"] = grown
+            job["shared"] = False
+
+    def observe(self, name, kind, cost, measured, shared=False):
+        with self._lock:
+            self.records.append({"job": name, "kind": kind, "estimate": cost, "peak": measured,
+                                 "shared": shared})
+            if not cost:
+                return
+            # corrections go up at once and come down slowly
+            factor = self.factors.get(kind, 1.0)
+            ratio = factor * measured / cost
+            if ratio > factor and not shared:
+                factor = ratio
+            elif ratio < factor:
+                factor = 0.8 * factor + 0.2 * ratio
+            self.factors[kind] = max(factor, 0.1)
+
+    def mark(self):
+        """Start a new summary window; returns where its records begin."""
+        with self._lock:
+            self.peak_in_use = self.in_use
+            return len(self.records)
+
+    def summary(self, since=0):
+        with self._lock:
+            records = self.records[since:]
+        exact = [r for r in records if not r["shared"]]
+        largest = max(records, key=lambda r: r["peak"], default=None)
+        guessed = sorted(self._guessed - set(self.factors))
+        return {"budget": self.budget, "peak_in_use": self.peak_in_use, "jobs": len(records),
+                "exact": len(exact), "largest": largest, "factors": dict(self.factors),
+                "records": records, "guessed": guessed}
@@ -1,191 +1,341 @@
-import bpy
+import importlib.util
 import os
 import math
+import tempfile
+import threading
 from pathlib import Path
-from collections import deque
+import numpy as np
 from PIL import Image
+import fbx
+from bleed import edge_expand
+from imaging import encode_png
+from tracing import span
+from geometry import MESH_MODES, build_quads, mesh_stats, solidify
+
+MESH_BACKENDS = ("bpy", "native")
+
+# bpy takes seconds and hundreds of MB to import, so it is only loaded by the
+# first bpy mesh (or warm_bpy); until then both stay None
+bpy = None
+bmesh = None
+
+
+def bpy_installed():
+    return importlib.util.find_spec("bpy") is not None
+
+
+def load_bpy():
+    """Import bpy and bmesh on first use; returns bpy, or None if it is not installed."""
+    global bpy, bmesh
+    if bpy is None and bpy_installed():
+        with span("import.bpy"):
+            import bmesh as _bmesh
+            import bpy as _bpy
+        bmesh = _bmesh
+        bpy = _bpy
+    return bpy
+
+
+_bpy_thread = None
+
+
+def warm_bpy():
+    """Start importing bpy on a background thread; the first mesh joins it."""
+    global _bpy_thread
+    if _bpy_thread is None:
+        _bpy_thread = threading.Thread(target=load_bpy, name="bpy-import", daemon=True)
+        _bpy_thread.start()
+    return _bpy_thread
+
+# items that only get the 90 degree X rotation, everything else is also tilted
+FLAT_NAMES = ["iron_ingot", "diamond", "ender_pearl", "emerald", "apple_golden"]
+
+# Blender Z-up to FBX Y-up, what export_scene.fbx applies with its defaults
+_AXIS_CONVERSION = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]])
+
+
+def _euler_xyz(rx, ry, rz):
+    # same matrix as Blender's Euler((rx, ry, rz), 'XYZ').to_matrix()
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    mx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    my = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    mz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return mz @ my @ mx
+
+
+def load_geometry(mesh, verts, faces, uvs):
+    # bulk equivalent of from_pydata plus one uv assignment per loop;
+    # faces are quads (an array) or, in merged mode, lists of 4+ corners
+    verts = np.asarray(verts, dtype=np.float32).reshape(-1, 3)
+    if isinstance(faces, np.ndarray):
+        loops = faces.astype(np.int32).ravel()
+        sizes = np.full(len(faces), 4, dtype=np.int32)
+    else:
+        sizes = np.fromiter(map(len, faces), dtype=np.int32, count=len(faces))
+        loops = np.fromiter((i for face in faces for i in face), dtype=np.int32, count=int(sizes.sum()))
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(loops.size)
+    mesh.loops.foreach_set("vertex_index", loops)
+    mesh.polygons.add(len(sizes))
+    mesh.polygons.foreach_set("loop_start", (np.cumsum(sizes) - sizes).astype(np.int32))
+    if not mesh.polygons.bl_rna.properties["loop_total"].is_readonly:
+        # before Blender 4.0 loop_total was set by hand, now it follows loop_start
+        mesh.polygons.foreach_set("loop_total", sizes)
+    mesh.update(calc_edges=True)
+
+    if len(uvs):
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set("uv", np.asarray(uvs, dtype=np.float32).ravel())
+        mesh.uv_layers.active = uv_layer
+        mesh.uv_layers.active_index = 0
+
+
+class BpySession:
+    """One Blender scene reused for every mesh.
+
+    Keeps a single object (with the Solidify modifier) and a single
+    PixelArtMaterial whose image is swapped per item, builds everything at
+    data level instead of through bpy.ops, and frees the previous mesh and
+    image after each export, so neither bpy.data nor the time per mesh grows
+    over a batch. Only the FBX export is still an operator.
+    """
+
+    def __init__(self, thickness=0.13):
+        for obj in list(bpy.data.objects):
+            bpy.data.objects.remove(obj, do_unlink=True)
+        self.obj = bpy.data.objects.new("PixelArtItem", bpy.data.meshes.new("PixelArtItem"))
+        bpy.context.collection.objects.link(self.obj)
+        solid = self.obj.modifiers.new(name="Solidify", type="SOLIDIFY")
+        solid.thickness = thickness
+        bpy.context.view_layer.objects.active = self.obj
+        self.obj.select_set(True)
+
+        self.material = bpy.data.materials.new(name="PixelArtMaterial")
+        # keep it through orphan purges between two meshes
+        self.material.use_fake_user = True
+        self.material.use_nodes = True
+        nodes = self.material.node_tree.nodes
+        links = self.material.node_tree.links
+        for node in list(nodes):
+            nodes.remove(node)
+        out_node = nodes.new("ShaderNodeOutputMaterial")
+        bsdf = nodes.new("ShaderNodeBsdfPrincipled")
+        self.tex_node = nodes.new("ShaderNodeTexImage")
+        self.tex_node.interpolation = "Closest"
+        links.new(self.tex_node.outputs["Color"], bsdf.inputs["Base Color"])
+        links.new(bsdf.outputs["BSDF"], out_node.inputs["Surface"])
+
+    def build(self, name, verts, faces, uvs, rotation, image):
+        with span("mesh.foreach_set", faces=len(faces)):
+            mesh = bpy.data.meshes.new(name)
+            load_geometry(mesh, verts, faces, uvs)
+
+        with span("mesh.normals"):
+            # the bmesh op behind normals_make_consistent, without edit mode
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
+            bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+            bm.to_mesh(mesh)
+            bm.free()
+
+        with span("mesh.material"):
+            mesh.materials.append(self.material)
+            self.tex_node.image = image
+
+        old, self.obj.data = self.obj.data, mesh
+        bpy.data.meshes.remove(old)
+        mesh.name = name
+        self.obj.name = name
+        # origin_set to the bounds followed by transform_apply moved the
+        # vertices there and straight back, so a fresh object transform is
+        # the same; the tilt stays on the object like before
+        self.obj.location = (0.0, 0.0, 0.0)
+        self.obj.rotation_euler = rotation
+        self.obj.select_set(True)
+
+    def release(self):
+        # after the export: the image goes, the mesh is replaced by the next build
+        image, self.tex_node.image = self.tex_node.image, None
+        if image is not None:
+            bpy.data.images.remove(image)
+        if hasattr(bpy.data, "orphans_purge"):
+            bpy.data.orphans_purge()
 
 
 class Mesh:
-    def __init__(self, base_folder, output_path, find_asset_fn):
+    def __init__(self, base_folder, output_path, find_asset_fn, mesh_mode="pixel", report_stats=False,
+                 backend=None, store=None, optimize_png=True):
+        if backend is None:
+            backend = "bpy" if bpy_installed() else "native"
+        if mesh_mode not in MESH_MODES:
+            raise ValueError(f"Unknown mesh mode: {mesh_mode}")
+        if backend not in MESH_BACKENDS:
+            raise ValueError(f"Unknown mesh backend: {backend}")
+        if backend == "bpy" and not bpy_installed():
+            raise RuntimeError("bpy is not installed, use the native mesh backend")
         self.base_folder = Path(base_folder)
         self.output_path = Path(output_path)
         self.find_asset = find_asset_fn
-        os.makedirs(self.output_path, exist_ok=True)
+        self.mesh_mode = mesh_mode
+        self.report_stats = report_stats
+        self.backend = backend
+        self.stats = {}
+        self.optimize_png = optimize_png
+        # with an ArtifactStore, textures are read from and written to it
+        # and only bpy's FBX export goes through a (temporary) file
+        self.store = store
+        self.session = None
+        if store is None:
+            os.makedirs(self.output_path, exist_ok=True)
+
+    def _report(self, image_name, base_img, verts, faces, uvs):
+        stats = {self.mesh_mode: mesh_stats(verts, faces, uvs)}
+        for mode in MESH_MODES:
+            if mode not in stats:
+                stats[mode] = mesh_stats(*build_quads(base_img, mode))
+        self.stats[image_name] = stats
+        for mode, s in stats.items():
+            mark = "*" if mode == self.mesh_mode else " "
+            print(f"[STATS]{mark}{image_name} {mode}: {s['faces']} faces, {s['verts']} verts, "
+                  f"{s['solid_faces']} faces after solidify, ~{s['approx_bytes']} bytes")
+
+    def _rotation(self, image_name):
+        rot_x = math.radians(90)
+        rot_y = math.radians(-45)
+        if image_name in FLAT_NAMES:
+            return rot_x, 0.0, 0.0
+        return rot_x, rot_y, 0.0
 
     def _edge_expand_512(self, img, max_dist=48, opacity_threshold=0, force_opaque=False):
-        src = img.resize((512, 512), Image.Resampling.NEAREST)
-        w, h = src.size
-        src_pixels = src.load()
-
-        INF = 10**9
-        dist = [[INF] * w for _ in range(h)]
-        nsrc_x = [[-1] * w for _ in range(h)]
-        nsrc_y = [[-1] * w for _ in range(h)]
-        q = deque()
-
-        for y in range(h):
-            for x in range(w):
-                r, g, b, a = src_pixels[x, y]
-                if a > opacity_threshold:
-                    dist[y][x] = 0
-                    nsrc_x[y][x] = x
-                    nsrc_y[y][x] = y
-                    q.append((x, y))
-
-        while q:
-            x, y = q.popleft()
-            d = dist[y][x]
-            if d >= max_dist:
-                continue
-            for dx, dy in ((1,0),(-1,0),(0,1),(0,-1)):
-                nx, ny = x+dx, y+dy
-                if 0 <= nx < w and 0 <= ny < h:
-                    nd = d + 1
-                    if nd < dist[ny][nx]:
-                        dist[ny][nx] = nd
-                        nsrc_x[ny][nx] = nsrc_x[y][x]
-                        nsrc_y[ny][nx] = nsrc_y[y][x]
-                        q.append((nx, ny))
-        out = Image.new("RGBA", (w, h), (0,0,0,0))
-        out_pixels = out.load()
-
-        for y in range(h):
-            for x in range(w):
-                if dist[y][x] <= max_dist:
-                    sx = nsrc_x[y][x]
-                    sy = nsrc_y[y][x]
-                    if sx >= 0 and sy >= 0:
-                        r, g, b, a = src_pixels[sx, sy]
-                        out_pixels[x, y] = (r, g, b, 255 if force_opaque else a)
-
-        return out
+        return edge_expand(img, size=512, max_dist=max_dist,
+                           opacity_threshold=opacity_threshold, force_opaque=force_opaque)
 
+    def texture_path(self, image_name):
+        # the edge-expanded 512x texture createMesh writes for the mesh
+        return self.base_folder / f"{image_name}_resized.png"
 
     def createMesh(self, image_name):
-        image_path = self.find_asset(f"{image_name}.png")
+        with span("createMesh", texture=image_name, backend=self.backend, mode=self.mesh_mode) as sp:
+            return self._create_mesh(image_name, sp)
+
+    def _create_mesh(self, image_name, sp):
+        if self.store is not None:
+            image_path = self.store.open(f"{image_name}.png")
+        else:
+            image_path = self.find_asset(f"{image_name}.png")
         if not image_path:
             print(f"Image does not exist! ({image_name})")
             return None
 
-        ctx_obj = getattr(bpy.context, "object", None)
-        if ctx_obj and ctx_obj.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action="SELECT")
-        bpy.ops.object.delete(use_global=False)
-
         export_name = self.output_path / f"{image_name}.fbx"
 
         base_img = Image.open(image_path).convert("RGBA")
         w, h = base_img.size
+        sp.set(res=w)
         if w != h:
             raise ValueError("Image must be square")
 
-        original_resolution = w
-        pixel_size = 2.0 / float(original_resolution)
-        pixels = base_img.load()
-
-        expanded = self._edge_expand_512(base_img, max_dist=48, opacity_threshold=0, force_opaque=False)
-        resize_path = self.base_folder / f"{image_name}_resized.png"
-        expanded.save(resize_path)
-
-        mesh = bpy.data.meshes.new(image_name)
-        obj = bpy.data.objects.new(image_name, mesh)
-        bpy.context.collection.objects.link(obj)
-
-        verts = []
-        faces = []
-        uvs = []
-
-        x_off = original_resolution / 2.0
-        y_off = original_resolution / 2.0
-
-        for y in range(original_resolution):
-            for x in range(original_resolution):
-                r, g, b, a = pixels[x, y]
-                if a <= 0:
-                    continue
-
-                z = 0.0
-
-                v1 = ((x - x_off) * pixel_size, (y_off - y) * pixel_size, z)
-                v2 = ((x + 1 - x_off) * pixel_size, (y_off - y) * pixel_size, z)
-                v3 = ((x + 1 - x_off) * pixel_size, (y_off - (y + 1)) * pixel_size, z)
-                v4 = ((x - x_off) * pixel_size, (y_off - (y + 1)) * pixel_size, z)
-
-                base_idx = len(verts)
-                verts.extend([v1, v2, v3, v4])
-                faces.append([base_idx, base_idx + 1, base_idx + 2, base_idx + 3])
-
-                uv1 = (x / original_resolution, (original_resolution - y) / original_resolution)
-                uv2 = ((x + 1) / original_resolution, (original_resolution - y) / original_resolution)
-                uv3 = ((x + 1) / original_resolution, (original_resolution - (y + 1)) / original_resolution)
-                uv4 = (x / original_resolution, (original_resolution - (y + 1)) / original_resolution)
-
-                uvs.extend([uv1, uv2, uv3, uv4])
-
-        mesh.from_pydata(verts, [], faces)
-        mesh.update()
-
-        if uvs:
-            uv_layer = mesh.uv_layers.new(name="UVMap")
-            for i, uv in enumerate(uvs):
-                uv_layer.data[i].uv = uv
-            mesh.uv_layers.active = uv_layer
-            mesh.uv_layers.active_index = 0
-
-        bpy.context.view_layer.objects.active = obj
-        obj.select_set(True)
-
-        solid = obj.modifiers.new(name="Solidify", type="SOLIDIFY")
-        solid.thickness = 0.13
-
-        bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-
-        valid_names = ["iron_ingot", "diamond", "ender_pearl", "emerald", "apple_golden"]
-        rot_x = math.radians(90)
-        rot_y = math.radians(-45)
-
-        if image_name in valid_names:
-            obj.rotation_euler[0] = rot_x
+        with span("mesh.edge_expand", res=w):
+            expanded = self._edge_expand_512(base_img, max_dist=48, opacity_threshold=0, force_opaque=False)
+        resize_path = self.texture_path(image_name)
+        with span("mesh.save_texture") as tex_sp:
+            data = encode_png(expanded, self.optimize_png)
+            tex_sp.set(bytes=len(data))
+            if self.store is not None:
+                self.store.put(resize_path.name, data)
+            else:
+                resize_path.write_bytes(data)
+
+        if self.backend == "native":
+            self._build_native(image_name, base_img, resize_path, export_name)
         else:
-            obj.rotation_euler[0] = rot_x
-            obj.rotation_euler[1] = rot_y
-
-        mat = bpy.data.materials.new(name="PixelArtMaterial")
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-
-        for node in list(nodes):
-            nodes.remove(node)
-
-        out_node = nodes.new("ShaderNodeOutputMaterial")
-        bsdf = nodes.new("ShaderNodeBsdfPrincipled")
-        tex_node = nodes.new("ShaderNodeTexImage")
-
-        tex_node.image = bpy.data.images.load(str(resize_path))
-        tex_node.interpolation = "Closest"
-
-        links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
-        links.new(bsdf.outputs["BSDF"], out_node.inputs["Surface"])
-
-        obj.data.materials.append(mat)
-        obj.data.materials[0] = mat
-
-        bpy.ops.object.mode_set(mode="EDIT")
-        bpy.ops.mesh.normals_make_consistent(inside=False)
-        bpy.ops.object.mode_set(mode="OBJECT")
-
-        bpy.ops.export_scene.fbx(
-            filepath=str(export_name),
-            global_scale=0.01,
-            use_selection=True,
-            add_leaf_bones=False,
-            mesh_smooth_type="OFF",
-            use_tspace=True,
-        )
-
+            self._build_bpy(image_name, base_img, resize_path, export_name, expanded)
+
+        if self.store is not None:
+            sp.set(bytes=len(self.store.get(export_name.name)))
+            if self.report_stats:
+                self.stats[image_name]["fbx_bytes"] = len(self.store.get(export_name.name))
+                print(f"[STATS] {image_name} FBX: {self.stats[image_name]['fbx_bytes']} bytes")
+            return export_name.name
+
+        sp.set(bytes=os.path.getsize(export_name))
+        if self.report_stats:
+            self.stats[image_name]["fbx_bytes"] = os.path.getsize(export_name)
+            print(f"[STATS] {image_name} FBX: {self.stats[image_name]['fbx_bytes']} bytes")
         print(f"Object exported to {self.output_path}")
         return str(export_name)
+
+    def _build_native(self, image_name, base_img, resize_path, export_name):
+        if self.report_stats:
+            self._report(image_name, base_img, *build_quads(base_img, self.mesh_mode))
+
+        with span("mesh.geometry") as sp:
+            positions, polygons, normals, uvs = solidify(base_img, self.mesh_mode, thickness=0.13)
+            # bpy keeps the tilt on the object and the FBX exporter converts
+            # the axes; baked into the vertices the item lands in the same place
+            rot = _AXIS_CONVERSION @ _euler_xyz(*self._rotation(image_name))
+            positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3) @ rot.T
+            normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3) @ rot.T
+            sp.set(faces=len(polygons), verts=len(positions))
+        with span("mesh.fbx_encode") as sp:
+            data = fbx.encode_mesh(image_name, positions, polygons, normals, uvs,
+                                   texture_path=resize_path, material_name="PixelArtMaterial")
+            sp.set(bytes=len(data))
+        if self.store is not None:
+            self.store.put(export_name.name, data)
+        else:
+            export_name.write_bytes(data)
+
+    def _bpy_texture(self, resize_path, expanded):
+        if self.store is None:
+            return bpy.data.images.load(str(resize_path))
+        # build the image from pixels instead of loading the PNG from a file;
+        # Blender stores rows bottom-up as floats
+        image = bpy.data.images.new(resize_path.name, expanded.width, expanded.height, alpha=True)
+        image.pixels.foreach_set((np.asarray(expanded, dtype=np.float32)[::-1] / 255.0).ravel())
+        return image
+
+    def warm(self):
+        # meshes are coming: start the bpy import while other stages run
+        if self.backend == "bpy" and bpy is None:
+            warm_bpy()
+
+    def _build_bpy(self, image_name, base_img, resize_path, export_name, expanded):
+        load_bpy()
+        if self.session is None:
+            self.session = BpySession(thickness=0.13)
+
+        with span("mesh.build_quads") as sp:
+            verts, faces, uvs = build_quads(base_img, self.mesh_mode)
+            sp.set(faces=len(faces), verts=len(verts))
+        if self.report_stats:
+            self._report(image_name, base_img, verts, faces, uvs)
+
+        try:
+            self.session.build(image_name, verts, faces, uvs, self._rotation(image_name),
+                               self._bpy_texture(resize_path, expanded))
+            if self.store is None:
+                self._export_bpy(export_name)
+                return
+            # the exporter only writes files, so go through a temporary one
+            with tempfile.TemporaryDirectory(dir=self.store.spill_dir) as tmp:
+                tmp_path = Path(tmp) / export_name.name
+                self._export_bpy(tmp_path)
+                self.store.put(export_name.name, tmp_path.read_bytes())
+        finally:
+            with span("mesh.purge"):
+                self.session.release()
+
+    def _export_bpy(self, export_name):
+        with span("mesh.export_fbx"):
+            bpy.ops.export_scene.fbx(
+                filepath=str(export_name),
+                global_scale=0.01,
+                use_selection=True,
+                add_leaf_bones=False,
+                mesh_smooth_type="OFF",
+                use_tspace=True,
+            )
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+# the Mesh owned by this worker process, built once by _init_worker
+_generator = None
+
+
+def find_in_folder(folder, filename):
+    p = Path(folder) / filename
+    return str(p) if p.exists() else None
+
+
+def _init_worker(mesh_kwargs, in_memory=False, trace=False):
+    global _generator
+    from mesh import Mesh
+    if trace:
+        from tracing import tracer
+        tracer.enable()
+    store = None
+    if in_memory:
+        from artifacts import ArtifactStore
+        store = ArtifactStore()
+    _generator = Mesh(find_asset_fn=partial(find_in_folder, mesh_kwargs["base_folder"]), store=store,
+                      **mesh_kwargs)
+    if _generator.backend == "bpy":
+        from mesh import load_bpy
+        load_bpy()
+
+
+def _ready():
+    return True
+
+
+def _run(job):
+    # in-memory jobs carry the source PNG and get back everything createMesh
+    # stored, since the workers do not share the caller's store; traced
+    # workers also send their spans along, and every job its peak memory
+    from memory import measured
+    from tracing import tracer
+    file_base, keys, *data = job
+    store = _generator.store
+    extras = {}
+    if store is None:
+        fbx, extras["peak"] = measured(_generator.createMesh, file_base)
+    else:
+        source = f"{file_base}.png"
+        store.put(source, data[0])
+        try:
+            fbx, extras["peak"] = measured(_generator.createMesh, file_base)
+            extras["outputs"] = {name: store.get(name) for name in store.names() if name != source}
+        finally:
+            store.clear()
+    if tracer.enabled:
+        extras["spans"] = tracer.take()
+    return fbx, keys, _generator.stats.pop(file_base, None), extras
+
+
+class MeshFarm:
+    """Pool of worker processes that each keep their own bpy scene.
+
+    bpy has one global scene per process, so meshes can only be built in
+    parallel across processes. Every worker imports bpy and builds its Mesh
+    once, then takes createMesh jobs until it has done max_jobs_per_worker of
+    them (None = never) and is replaced by a fresh process.
+    """
+
+    def __init__(self, base_folder, output_path, workers=None, max_jobs_per_worker=None, in_memory=False,
+                 trace=False, **mesh_kwargs):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.in_memory = in_memory
+        self.trace = trace
+        self.mesh_kwargs = dict(mesh_kwargs, base_folder=str(base_folder), output_path=str(output_path))
+        self._pool = None
+
+    def start(self):
+        if self._pool is None:
+            # spawn, not fork: a forked bpy is not safe and fork cannot recycle workers
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.mesh_kwargs, self.in_memory, self.trace),
+                max_tasks_per_child=self.max_jobs_per_worker,
+            )
+        return self
+
+    def warm(self):
+        """Spawn all workers now, so their bpy imports overlap other work."""
+        if self._pool is None:
+            self.start()
+            for _ in range(self.workers):
+                self._pool.submit(_ready)
+
+    def submit(self, file_base, keys, data=None):
+        job = (file_base, keys) if data is None else (file_base, keys, data)
+        return self.start()._pool.submit(_run, job)
+
+    def map(self, jobs):
+        return self.start()._pool.map(_run, jobs)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
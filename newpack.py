@@ -20,11 +20,14 @@ NEW_PACK_MARKERS = {
 }
 
 
-def is_new_java_pack(zip_path: str | Path) -> bool:
+def is_new_java_pack(zip_path: str | Path, index=None) -> bool:
     zip_path = Path(zip_path)
     if not zip_path.exists() or zip_path.suffix.lower() != ".zip":
         return False
 
+    if index is not None:
+        return index.has_any(NEW_PACK_MARKERS)
+
     try:
         with zipfile.ZipFile(zip_path, "r") as zf:
             entries = [info.filename for info in zf.infolist()]
@@ -32,8 +35,7 @@ def is_new_java_pack(zip_path: str | Path) -> bool:
         return False
 
     base_names = {Path(n).name for n in entries if not n.endswith("/")}
-    if base_names.intersection(NEW_PACK_MARKERS):
-        return True
+    return bool(base_names.intersection(NEW_PACK_MARKERS))
 
 def get_new_base(base: str) -> str:
     if base.startswith("clay_"):
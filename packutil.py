@@ -1,6 +1,18 @@
 import base64
 import zstandard as zstd
 import json
+from template import TEMPLATE_KEYS
+
+# first byte of a compact payload; legacy payloads are JSON and start with "{"
+COMPACT_VERSION = 2
+
+
+def _varint(n, out):
+    while n > 0x7F:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
 
 class PackUtil:
     @staticmethod
@@ -12,10 +24,63 @@ class PackUtil:
         final_obj = {"m": None, "t": "buffer", "zbase64": b64}
         return json.dumps(final_obj)
 
+    @staticmethod
+    def encode_compact(items):
+        """Asset ids as LEB128 varints in TEMPLATE_KEYS order, after a version
+        byte and the key count; missing keys and "0" are 0."""
+        out = bytearray([COMPACT_VERSION])
+        _varint(len(TEMPLATE_KEYS), out)
+        for k in TEMPLATE_KEYS:
+            value = str(items.get(k, "0"))
+            if not value.isdigit():
+                raise ValueError(f"Asset id for {k} is not a number: {value!r}")
+            _varint(int(value), out)
+        return bytes(out)
+
+    @staticmethod
+    def decode_compact(data):
+        if not data or data[0] != COMPACT_VERSION:
+            raise ValueError(f"Unknown PackUtil format version {data[:1].hex() or 'empty'}")
+        values = []
+        n = shift = 0
+        for b in data[1:]:
+            if b < 0x80:
+                values.append(n | b << shift)
+                n = shift = 0
+            else:
+                n |= (b & 0x7F) << shift
+                shift += 7
+        count = values[0]
+        if count != len(values) - 1 or count > len(TEMPLATE_KEYS):
+            raise ValueError("Truncated or corrupt compact PackUtil data")
+        # keys only ever get appended, so an older string just lacks the last ones
+        items = {k: str(v) for k, v in zip(TEMPLATE_KEYS, values[1:])}
+        for k in TEMPLATE_KEYS[count:]:
+            items[k] = "0"
+        return items
+
+    @staticmethod
+    def compress_items(items):
+        """Compact (version 2) PackUtil string for a TEMPLATE_KEYS -> asset id dict."""
+        cctx = zstd.ZstdCompressor(level=9)
+        b64 = base64.b64encode(cctx.compress(PackUtil.encode_compact(items))).decode("utf-8")
+        return json.dumps({"m": None, "t": "buffer", "zbase64": b64})
+
+    @staticmethod
+    def decompress_items(json_data):
+        """TEMPLATE_KEYS -> asset id dict from a PackUtil string of either format."""
+        parsed = json.loads(json_data)
+        raw = zstd.ZstdDecompressor().decompress(base64.b64decode(parsed["zbase64"]))
+        if raw[:1] == b"{":
+            return json.loads(raw)
+        return PackUtil.decode_compact(raw)
+
     @staticmethod
     def decompress_json(json_data):
         parsed = json.loads(json_data)
         compressed = base64.b64decode(parsed["zbase64"])
         dctx = zstd.ZstdDecompressor()
         raw = dctx.decompress(compressed)
+        if raw[:1] != b"{":
+            return json.dumps(PackUtil.decode_compact(raw))
         return raw.decode("utf-8")
@@ -0,0 +1,192 @@
+import queue
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from tracing import span
+
+
+class Stage:
+    def __init__(self, name, executor=None, limit=None):
+        self.name = name
+        # None runs jobs inline on the thread that called Pipeline.run()
+        self.executor = executor
+        self.limit = limit
+        self.running = 0
+        self.first_start = None
+        self.last_end = None
+        self.jobs = 0
+
+    def has_room(self):
+        return self.limit is None or self.running < self.limit
+
+    @property
+    def duration(self):
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+
+class Node:
+    def __init__(self, name, stage, fn, inputs, cost=0, kind=None):
+        self.name = name
+        self.stage = stage
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.dependents = []
+        self.missing = len(self.inputs)
+        # estimated peak memory in bytes, and what kind of job it is
+        self.cost = cost
+        self.kind = kind
+        self.admitted = False
+
+    def call(self, *args):
+        with span(f"stage.{self.stage.name}", node=self.name):
+            return self.fn(*args)
+
+
+class Pipeline:
+    """Graph of named artifacts, each built as soon as its inputs exist.
+
+    Every node belongs to a stage with its own executor and a cap on how
+    many of its jobs run at once, so e.g. uploads start while meshes are
+    still being built. A job gets its inputs' results as arguments and may
+    return a Future (an upload waiting on its operation), in which case the
+    node finishes when that resolves. A node whose input failed or returned
+    None is skipped and resolves to None itself.
+
+    Ready jobs start largest estimated memory cost first. With a
+    MemoryBudget, a job with a cost only starts while it fits, holds its
+    share until it finishes, and has its real peak memory measured.
+    """
+
+    def __init__(self, memory=None):
+        self.stages = {}
+        self.nodes = {}
+        self.results = {}
+        self.memory = memory
+
+    def stage(self, name, executor=None, limit=None):
+        self.stages[name] = Stage(name, executor, limit)
+        return self.stages[name]
+
+    def add(self, name, stage, fn, inputs=(), cost=0, kind=None):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {name}")
+        for i in inputs:
+            if i not in self.nodes:
+                raise ValueError(f"Unknown input {i} for pipeline node {name}")
+        node = Node(name, self.stages[stage], fn, inputs, cost, kind)
+        self.nodes[name] = node
+        for i in inputs:
+            self.nodes[i].dependents.append(node)
+        return node
+
+    def _call(self, node, *args):
+        if self.memory is None or not node.cost:
+            return node.call(*args)
+        with self.memory.measure(node.name, node.kind, node.cost) as job:
+            value = node.call(*args)
+            # the work happens elsewhere, which reports its own peak
+            job["skip"] = isinstance(value, Future)
+        return value
+
+    def _admit(self, node):
+        if self.memory is None or not node.cost:
+            return True
+        node.admitted = self.memory.admit(node.cost)
+        return node.admitted
+
+    def run(self):
+        done = queue.Queue()
+        ready = deque(n for n in self.nodes.values() if not n.missing)
+        remaining = len(self.nodes)
+
+        def finish(node, value):
+            nonlocal remaining
+            node.stage.last_end = time.perf_counter()
+            if node.admitted:
+                self.memory.release(node.cost)
+                node.admitted = False
+            self.results[node.name] = value
+            remaining -= 1
+            for dep in node.dependents:
+                dep.missing -= 1
+                if not dep.missing:
+                    ready.append(dep)
+
+        def settle(node, value):
+            if isinstance(value, Future):
+                value.add_done_callback(lambda f: done.put((node, f, False)))
+            else:
+                finish(node, value)
+
+        def outcome(node, f):
+            try:
+                return f.result()
+            except Exception as e:
+                print(f"[ERROR] {node.name} failed: {e!r}")
+                return None
+
+        while remaining:
+            # start everything that has room; skipped nodes can free up
+            # their dependents, so repeat until nothing changes
+            inline = None
+            progress = True
+            while progress:
+                progress = False
+                # largest first; once one does not fit the budget, no other
+                # job with a cost may overtake it
+                ready = deque(sorted(ready, key=lambda n: -n.cost))
+                blocked = False
+                for _ in range(len(ready)):
+                    node = ready.popleft()
+                    args = [self.results[i] for i in node.inputs]
+                    stage = node.stage
+                    if any(a is None for a in args):
+                        finish(node, None)
+                        progress = True
+                    elif (node.cost and blocked or stage.executor is None and inline is not None
+                          or stage.executor is not None and not stage.has_room()):
+                        ready.append(node)
+                    elif not self._admit(node):
+                        blocked = True
+                        ready.append(node)
+                    elif stage.executor is None:
+                        inline = (node, args)
+                    else:
+                        stage.running += 1
+                        stage.jobs += 1
+                        if stage.first_start is None:
+                            stage.first_start = time.perf_counter()
+                        f = stage.executor.submit(self._call, node, *args)
+                        f.add_done_callback(lambda f, node=node: done.put((node, f, True)))
+                        progress = True
+
+            if inline is not None:
+                node, args = inline
+                node.stage.jobs += 1
+                if node.stage.first_start is None:
+                    node.stage.first_start = time.perf_counter()
+                try:
+                    value = self._call(node, *args)
+                except Exception as e:
+                    print(f"[ERROR] {node.name} failed: {e!r}")
+                    value = None
+                settle(node, value)
+
+            # collect finished work, waiting only when nothing could start
+            block = inline is None and remaining > 0
+            while True:
+                try:
+                    node, f, from_executor = done.get(block=block)
+                except queue.Empty:
+                    break
+                block = False
+                if from_executor:
+                    node.stage.running -= 1
+                    settle(node, outcome(node, f))
+                else:
+                    finish(node, outcome(node, f))
+
+        return self.results
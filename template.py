@@ -0,0 +1,68 @@
+import re
+
+from mcpack import is_mcpack_file, get_mcpack_file_base
+from newpack import is_new_java_pack, get_new_base, NEW_CLAY_BLOCK_NAMES
+
+CLAY_BLOCK_NAMES = {
+    "ClayBlue": "hardened_clay_stained_blue.png",
+    "ClayRed": "hardened_clay_stained_red.png",
+    "ClayWhite": "hardened_clay_stained_white.png"
+}
+
+TEMPLATE_KEYS = [
+    "JumpPotionMesh","GoldAppleTexture","Bow0Texture","ClayWhite","Bow1Texture","Bow2Texture","ClayGreen",
+    "BlocksVPImage","ClayOrange","ClayGrey","SpeedPotionVPImage","GoldSwordVPImage","JumpPotionTexture",
+    "SwordTexture","Bow2Mesh","PearlVPImage","SwordMesh","PearlTexture","DiamondSwordVPImage",
+    "JumpPotionVPImage","IronVPImage","SpeedPotionMesh","SpeedPotionTexture","PearlMesh","Bow0Mesh",
+    "EmeraldVPImage","DiamondVPImage","EmeraldTexture","GoldAppleMesh","Bow3Texture","GoldPickaxeTexture",
+    "Bow1Mesh","ClayYellow","PickaxeVPImage","Bow3Mesh","DefaultBowVPImage","GoldAppleVPImage","IronTexture",
+    "ClayPurple","PickaxeTexture","WoodenSwordTexture","DiamondSwordTexture","WoodenPickaxeTexture",
+    "GoldPickaxeVPImage","PickaxeMesh","GoldSwordTexture","DiamondTexture","WoodenPickaxeVPImage","ClayCyan",
+    "ClayRed","SwordVPImage","WoodenSwordVPImage","DiamondMesh","DiamondPickaxeVPImage","IronMesh",
+    "DiamondPickaxeTexture","EmeraldMesh","ClayBlue"
+]
+
+def camel_to_snake(n):
+    n1 = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", n)
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", n1).lower()
+
+def get_base_name(k):
+    if k.startswith("Clay"):
+        return camel_to_snake(k), "Texture"
+    for suf in ("Mesh","Texture","VPImage"):
+        if k.endswith(suf):
+            return camel_to_snake(k[:-len(suf)]), suf
+    return None, None
+
+def get_file_base(base):
+    if base.startswith("clay_"):
+        c = base.split("_")[1]
+        if c == "grey":
+            c = "gray"
+        return f"wool_colored_{c}"
+    o = {
+        "gold_apple":"apple_golden","pearl":"ender_pearl","jump_potion":"potion_bottle_drinkable",
+        "speed_potion":"potion_bottle_drinkable","wooden_sword":"wood_sword","wooden_pickaxe":"wood_pickaxe",
+        "sword":"iron_sword","pickaxe":"stone_pickaxe","iron":"iron_ingot","gold_sword":"gold_sword",
+        "gold_pickaxe":"gold_pickaxe","diamond_sword":"diamond_sword","diamond_pickaxe":"diamond_pickaxe",
+        "bow0":"bow_standby","bow1":"bow_pulling_0","bow2":"bow_pulling_1","bow3":"bow_pulling_2",
+        "default_bow":"bow_standby"
+    }
+    return o.get(base, base)
+
+def build_required_pngs(file_base_fn, clay_names):
+    required = []
+    for k in TEMPLATE_KEYS:
+        base, kind = get_base_name(k)
+        if base:
+            required.append(file_base_fn(base) + ".png")
+    required.extend(clay_names.values())
+    return required
+
+def detect_pack(zp, index=None):
+    """Return the file name mapping and clay texture names for the pack's format."""
+    if is_mcpack_file(zp):
+        return get_mcpack_file_base, CLAY_BLOCK_NAMES
+    if is_new_java_pack(zp, index):
+        return get_new_base, NEW_CLAY_BLOCK_NAMES
+    return get_file_base, CLAY_BLOCK_NAMES
@@ -0,0 +1,52 @@
+import io
+import sys
+import time
+import types
+import zipfile
+
+# converter reads config.py, which only exists in a user's install
+sys.modules.setdefault("config", types.SimpleNamespace(API_KEY="test", CREATOR_USER_ID=1))
+
+import converter
+import fbx
+from benchmarks.textures import make_texture
+from fakecloud import FakeCloud
+
+ITEMS = ["wood_sword", "iron_sword", "bow_standby", "diamond", "apple_golden"]
+
+
+def make_pack(path):
+    with zipfile.ZipFile(path, "w") as z:
+        for i, name in enumerate(ITEMS):
+            buf = io.BytesIO()
+            make_texture(16, i).save(buf, "PNG")
+            z.writestr(f"assets/minecraft/textures/items/{name}.png", buf.getvalue())
+    return path
+
+
+def test_second_run_uploads_no_meshes(tmp_path, monkeypatch):
+    # like bpy's exporter, stamp every FBX with the time it was written
+    encode_mesh = fbx.encode_mesh
+    monkeypatch.setattr(fbx, "encode_mesh",
+                        lambda *a, **kw: encode_mesh(*a, **kw) + str(time.time_ns()).encode())
+    monkeypatch.setattr(converter, "MESH_BACKEND", "native")
+    monkeypatch.setattr(converter, "MESH_WORKERS", 1)
+    monkeypatch.setattr(converter, "ARTIFACTS_IN_MEMORY", False)
+    monkeypatch.setattr(converter, "UPLOAD_JOURNAL", None)
+    monkeypatch.setattr(converter, "ASSET_CACHE", tmp_path / "cache.sqlite3")
+    pack = make_pack(tmp_path / "pack.zip")
+    with FakeCloud(completion_delay=0.05) as cloud:
+        monkeypatch.setattr(converter, "UPLOAD_BASE_URL", cloud.url)
+        conv = converter.Converter(workspace=tmp_path / "work")
+        try:
+            meshes = []
+            submit = conv.uploader.submitMesh
+            conv.uploader.submitMesh = lambda *a, **kw: meshes.append(a[1]) or submit(*a, **kw)
+            first = conv.convert(pack)
+            uploaded = len(meshes)
+            second = conv.convert(pack)
+        finally:
+            conv.close()
+    assert uploaded > 0
+    assert len(meshes) == uploaded
+    assert second["items"] == first["items"]
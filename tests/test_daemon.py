@@ -0,0 +1,55 @@
+import time
+
+from daemon import Daemon
+
+
+def fake_worker(workspace, conn):
+    # stands in for _worker: no config, Converter or uploads
+    conn.send(("ready", None, None))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        conn.send(("done", job[0], {"pack": job[1]}))
+
+
+def wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class BrokenPipe:
+    # the pipe of a worker that died right after it said it was ready
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def send(self, obj):
+        raise BrokenPipeError(32, "Broken pipe")
+
+
+def test_worker_dying_between_ready_and_send(tmp_path):
+    service = Daemon(workers=1, workspace=tmp_path, worker=fake_worker).start()
+    try:
+        assert wait_for(lambda: service.slots[0]["ready"])
+        old = service.slots[0]["process"]
+        with service.cond:
+            service.slots[0]["conn"] = BrokenPipe(service.slots[0]["conn"])
+        job = service.submit("pack.zip", b"not a real pack")
+        # requeued, and run by the worker that replaced the dead one
+        assert wait_for(lambda: service.status(job["id"])["status"] == "done")
+        assert service.slots[0]["process"] is not old
+        assert service.status(job["id"])["error"] is None
+        again = service.submit("pack.zip", b"not a real pack")
+        assert wait_for(lambda: service.status(again["id"])["status"] == "done")
+    finally:
+        service.close()
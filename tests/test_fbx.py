@@ -0,0 +1,17 @@
+from PIL import Image
+
+from fbx import encode_mesh
+from geometry import solidify
+
+
+def test_native_fbx_does_not_depend_on_output_folder(tmp_path):
+    img = Image.new("RGBA", (4, 4), (255, 255, 255, 255))
+    positions, polygons, normals, uvs = solidify(img, "merged")
+    blobs = []
+    for folder in ("one", "two"):
+        texture = tmp_path / folder / "sprite.png"
+        texture.parent.mkdir()
+        img.save(texture)
+        blobs.append(encode_mesh("sprite", positions, polygons, normals, uvs, texture))
+    assert blobs[0] == blobs[1]
+    assert str(tmp_path).encode() not in blobs[0]
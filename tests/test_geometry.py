@@ -0,0 +1,39 @@
+from collections import Counter
+
+from PIL import Image
+
+from geometry import merged_quads, solidify
+
+
+def edge_uses(polygons):
+    uses = Counter()
+    for poly in polygons:
+        for a, b in zip(poly, poly[1:] + poly[:1]):
+            uses[min(a, b), max(a, b)] += 1
+    return uses
+
+
+def staircase():
+    # a 4x1 bar over two 1x1 pixels and a gap: the bar's bottom edge meets
+    # the corners of the pixels below it
+    img = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+    for x in range(4):
+        img.putpixel((x, 0), (255, 255, 255, 255))
+    img.putpixel((0, 1), (255, 255, 255, 255))
+    img.putpixel((2, 1), (255, 255, 255, 255))
+    return img
+
+
+def test_merged_quads_have_no_t_junctions():
+    verts, faces, uvs = merged_quads(staircase())
+    # the bar's bottom edge carries the corners x=1, 2 and 3 of the pixels below
+    assert max(len(f) for f in faces) == 7
+    assert len(uvs) == sum(len(f) for f in faces)
+    inner = [e for e, n in edge_uses(faces).items() if n == 2]
+    assert len(inner) == 2
+
+
+def test_merged_solid_is_closed():
+    _, polygons, normals, uvs = solidify(staircase(), "merged")
+    assert set(edge_uses(polygons).values()) == {2}
+    assert len(normals) == len(uvs) == sum(len(p) for p in polygons)
@@ -0,0 +1,43 @@
+from journal import UploadJournal
+
+
+def test_torn_line_does_not_swallow_next_record(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = UploadJournal(path)
+    journal.begin("pack")
+    journal.started("a")
+    journal.posted("a", "op1")
+    journal.close()
+    # a crash in the middle of writing the next line
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"job": "a", "pack": "pack", "sta')
+
+    journal = UploadJournal(path)
+    journal.begin("pack")
+    assert journal.operation("a") == "op1"
+    journal.finished("a", 123)
+    journal.close()
+
+    journal = UploadJournal(path)
+    assert journal.asset("a") == "123"
+    assert journal.operation("a") is None
+    journal.close()
+
+
+def test_completed_run_drops_its_jobs(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = UploadJournal(path)
+    journal.begin("interrupted")
+    journal.posted("a", "op1")
+    journal.begin("pack")
+    journal.finished("b", 5)
+    journal.complete()
+    # late callbacks of the completed run are not logged
+    journal.finished("c", 6)
+    journal.close()
+
+    journal = UploadJournal(path)
+    assert journal.operation("a") == "op1"
+    assert journal.asset("b") is None
+    assert journal.asset("c") is None
+    journal.close()
@@ -0,0 +1,12 @@
+import zipfile
+
+from zip import PackIndex
+
+
+def test_backslash_entries_resolve_by_basename(tmp_path):
+    pack = tmp_path / "pack.zip"
+    with zipfile.ZipFile(pack, "w") as zf:
+        zf.writestr("assets\\minecraft\\textures\\items\\diamond.png", b"item")
+        zf.writestr("assets\\minecraft\\optifine\\cit\\diamond.png", b"override")
+    with PackIndex(pack) as index:
+        assert index.read("diamond.png") == b"item"
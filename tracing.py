@@ -0,0 +1,200 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+
+class _NullSpan:
+    # what span() hands out while tracing is off: no timing, no allocation
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.profile = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        if self.name == self.tracer.profile_name:
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:
+                # another profiler already runs on this thread (nested span)
+                self.profile = None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if self.profile is not None:
+            self.profile.disable()
+            self.tracer.add_profile(self.profile)
+        if exc is not None:
+            self.attrs["error"] = repr(exc)
+        self.tracer.record(self.name, self.start, end, **self.attrs)
+        return False
+
+
+class Tracer:
+    """Collects timed spans (name, start, end, thread, attributes) from every
+    thread, and worker processes via take()/extend().
+
+    Spans are only recorded after enable(); until then span() is a no-op.
+    When profile_name is set, every span of that name also runs under
+    cProfile and the results are merged.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.profile_name = None
+        self.events = []
+        self.threads = {}
+        self.profiles = []
+        self.lock = threading.Lock()
+
+    def enable(self, profile_name=None):
+        self.enabled = True
+        self.profile_name = profile_name
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NULL
+        return Span(self, name, attrs)
+
+    def record(self, name, start, end, **attrs):
+        """Add a span that was timed elsewhere (perf_counter seconds)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {"name": name, "start": start, "end": end, "pid": os.getpid(), "tid": thread.ident,
+                 "attrs": attrs}
+        with self.lock:
+            self.events.append(event)
+            self.threads[(event["pid"], event["tid"])] = thread.name
+
+    def counter(self, name, **values):
+        """A value over time, e.g. a concurrency limit (a counter track in Chrome)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        event = {"name": name, "start": now, "end": now, "pid": os.getpid(), "tid": 0, "attrs": values,
+                 "counter": True}
+        with self.lock:
+            self.events.append(event)
+
+    def add_profile(self, profile):
+        with self.lock:
+            self.profiles.append(profile)
+
+    def take(self):
+        # hand this process's spans to another one, e.g. from a mesh worker
+        with self.lock:
+            events, self.events = self.events, []
+            threads, self.threads = self.threads, {}
+        return {"events": events, "threads": threads}
+
+    def extend(self, taken):
+        with self.lock:
+            self.events.extend(taken["events"])
+            self.threads.update(taken["threads"])
+
+    def chrome(self):
+        """Events in Chrome trace format (chrome://tracing, Perfetto)."""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        t0 = min((e["start"] for e in events), default=0.0)
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+               for (pid, tid), name in threads.items()]
+        for e in events:
+            if e.get("counter"):
+                out.append({"name": e["name"], "ph": "C", "ts": (e["start"] - t0) * 1e6, "pid": e["pid"],
+                            "args": e["attrs"]})
+                continue
+            out.append({
+                "name": e["name"],
+                "cat": e["name"].split(".")[0],
+                "ph": "X",
+                "ts": (e["start"] - t0) * 1e6,
+                "dur": (e["end"] - e["start"]) * 1e6,
+                "pid": e["pid"],
+                "tid": e["tid"],
+                "args": {k: v if isinstance(v, (int, float, bool, str)) or v is None else str(v)
+                         for k, v in e["attrs"].items()},
+            })
+        return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+    def write_chrome(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome(), f)
+
+    def summary(self):
+        """(name, count, total, mean, max) per span name, slowest total first."""
+        by_name = {}
+        with self.lock:
+            for e in self.events:
+                if e.get("counter"):
+                    continue
+                by_name.setdefault(e["name"], []).append(e["end"] - e["start"])
+        rows = [(name, len(d), sum(d), sum(d) / len(d), max(d)) for name, d in by_name.items()]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        width = max(len(r[0]) for r in rows)
+        print(f"{'span':<{width}} {'count':>7} {'total':>9} {'mean':>9} {'max':>9}")
+        for name, count, total, mean, longest in rows:
+            print(f"{name:<{width}} {count:>7} {total:>8.3f}s {mean * 1000:>7.1f}ms {longest * 1000:>7.1f}ms")
+
+    def profile_stats(self):
+        with self.lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return None
+        return pstats.Stats(*profiles, stream=io.StringIO())
+
+    def write_profile(self, path, top=25):
+        stats = self.profile_stats()
+        if stats is None:
+            print(f"[WARN] No {self.profile_name!r} spans ran in this process, nothing was profiled")
+            return
+        stats.dump_stats(path)
+        stats.stream = io.StringIO()
+        stats.sort_stats("cumulative").print_stats(top)
+        print(stats.stream.getvalue())
+
+    def reset(self):
+        with self.lock:
+            self.events = []
+            self.threads = {}
+            self.profiles = []
+
+
+tracer = Tracer()
+
+
+def span(name, **attrs):
+    return tracer.span(name, **attrs)
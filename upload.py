@@ -1,32 +1,425 @@
+import asyncio
+import heapq
+import random
+import threading
 import time
 import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from tracing import span, tracer
+
+API_BASE_URL = "https://apis.roblox.com"
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` requests per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on the number of requests in flight.
+
+    Each healthy response raises the limit by 1/limit (about +1 per round
+    of requests). A 429/5xx, a dropped connection, or a smoothed latency
+    above latency_factor times the best seen for that kind of request (and
+    at least min_latency_rise seconds above it, so jitter on fast responses
+    does not count), multiplies it by `decrease`. Cuts happen at most once per `cooldown`
+    seconds, so a burst of failures counts once. Every cut and every change
+    of the whole-number limit is kept in `history` as (time, limit, reason).
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=64, decrease=0.5, latency_factor=2.0,
+                 min_latency_rise=0.1, cooldown=1.0):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.min_latency_rise = min_latency_rise
+        self.cooldown = cooldown
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.inflight = 0
+        self.ewma = {}
+        self.best = {}
+        self.history = [(time.monotonic(), int(self.limit), "start")]
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def release(self, kind, latency, ok):
+        with self._cond:
+            self.inflight -= 1
+            now = time.monotonic()
+            reason = "error"
+            if ok:
+                ewma = self.ewma.get(kind, latency)
+                self.ewma[kind] = ewma = 0.8 * ewma + 0.2 * latency
+                self.best[kind] = best = min(self.best.get(kind, latency), latency)
+                slow = ewma > max(best * self.latency_factor, best + self.min_latency_rise)
+                reason = "latency" if slow else None
+            if reason is None:
+                self._set(min(self.maximum, self.limit + 1.0 / self.limit), "increase", now)
+            elif now - self._last_cut >= self.cooldown:
+                self._last_cut = now
+                self._set(max(self.minimum, self.limit * self.decrease), reason, now)
+            self._cond.notify_all()
+
+    def _set(self, limit, reason, now):
+        changed = int(limit) != int(self.limit)
+        self.limit = limit
+        if changed or reason != "increase":
+            self.history.append((now, int(limit), reason))
+            tracer.counter("upload.concurrency", limit=int(limit))
+
+    def summary(self, since=0.0):
+        """Start, range and end of the limit since a monotonic time, plus cuts."""
+        with self._cond:
+            history = list(self.history)
+        before = [h for h in history if h[0] < since]
+        window = before[-1:] + [h for h in history if h[0] >= since]
+        limits = [h[1] for h in window]
+        reasons = [h[2] for h in window[1:]]
+        return {"start": limits[0], "min": min(limits), "max": max(limits), "end": limits[-1],
+                "cuts": {r: reasons.count(r) for r in ("error", "latency")}}
+
+
+class Transport:
+    """Shared keep-alive HTTP session with retries for the Open Cloud API.
+
+    429 and 5xx responses and connection errors are retried up to
+    max_retries times, waiting for Retry-After when the server sends it and
+    for a jittered exponential backoff otherwise. A POST may already have
+    created its asset when it failed, so it is only retried on 429, on 503
+    with Retry-After and when the connection could not be opened. With an
+    AdaptiveConcurrency, every attempt waits for a slot in it and reports
+    its latency and outcome back.
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+    def __init__(self, api_key, max_retries=5, backoff_base=0.5, backoff_max=30.0,
+                 rate_limit=None, pool_size=16, timeout=60, base_url=API_BASE_URL, concurrency=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        self.session.headers.update({"x-api-key": api_key})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, resp):
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return min(self.backoff_max, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+    def _retryable(self, method, status, retry_after):
+        if status not in self.RETRY_STATUS:
+            return False
+        if method in self.IDEMPOTENT:
+            return True
+        # only what the server says it turned away
+        return status == 429 or status == 503 and retry_after is not None
+
+    def request(self, method, url, **kwargs):
+        with span("http", method=method, path=url.split("/", 3)[-1]) as sp:
+            resp = self._request(method, url, **kwargs)
+            sp.set(status=resp.status_code if resp is not None else None)
+            return resp
+
+    def _request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            with self.lock:
+                self.requests += 1
+            if self.concurrency:
+                self.concurrency.acquire()
+            start = time.perf_counter()
+            resp = None
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries or not (method in self.IDEMPOTENT or _not_sent(e)):
+                    print(f"[ERROR] {method} {url} failed: {e}")
+                    return None
+                delay = self._backoff(attempt)
+            else:
+                delay = self._retry_after(resp)
+                if not self._retryable(method, resp.status_code, delay) or attempt == self.max_retries:
+                    return resp
+                if delay is None:
+                    delay = self._backoff(attempt)
+            finally:
+                if self.concurrency:
+                    ok = resp is not None and resp.status_code not in self.RETRY_STATUS
+                    self.concurrency.release(method, time.perf_counter() - start, ok)
+            with self.lock:
+                self.retries += 1
+            time.sleep(delay)
+        return None
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def _not_sent(error):
+    # the connection was never opened, so the server cannot have seen the request
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _json(resp):
+    if resp is None:
+        return {}
+    try:
+        return resp.json()
+    except ValueError:
+        print(f"[ERROR] Unexpected response ({resp.status_code}): {resp.text[:200]}")
+        return {}
+
+
+def _payload(source, name=None):
+    # a path, or the file's bytes/buffer with the name to upload it as
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return name or "asset", bytes(source)
+    if hasattr(source, "read"):
+        return name or Path(getattr(source, "name", "asset")).name, source.read()
+    path = Path(source)
+    if not path.exists():
+        return None
+    return name or path.name, path.read_bytes()
+
+
+def _resolved(value):
+    f = Future()
+    f.set_result(value)
+    return f
+
+
+class OperationPoller:
+    """One background thread that polls every pending asset operation.
+
+    Each operation is first checked after initial_delay seconds, then at
+    intervals growing by `backoff` up to max_delay, and gives up (resolving
+    to None) after `timeout` seconds. Due operations are fetched together
+    on a small thread pool, so uploaders never poll themselves. A poll that
+    fails is tried again like one that is not done yet.
+    """
+
+    def __init__(self, transport, initial_delay=0.25, max_delay=5.0, backoff=1.6, timeout=300,
+                 poll_workers=4):
+        self.transport = transport
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+        self.poll_workers = poll_workers
+        self.poll_requests = 0
+        self._ops = {}
+        self._heap = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, op_id):
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("the operation poller is closed")
+            op = self._ops.get(op_id)
+            if op:
+                return op["future"]
+            future = Future()
+            self._ops[op_id] = {"future": future, "delay": self.initial_delay, "deadline": now + self.timeout,
+                                "started": time.perf_counter(), "polls": 0}
+            heapq.heappush(self._heap, (now + self.initial_delay, op_id))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="operation-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def pending(self):
+        with self._cond:
+            return len(self._ops)
+
+    def stats(self):
+        with self._cond:
+            return {"pending": len(self._ops), "poll_requests": self.poll_requests}
+
+    def _check(self, op_id):
+        url = f"{self.transport.base_url}/assets/v1/operations/{op_id}"
+        try:
+            data = _json(self.transport.get(url))
+        except Exception as e:
+            # e.g. a body cut off mid-stream; the next poll may do better
+            print(f"[WARN] Polling operation {op_id} failed: {e!r}")
+            return op_id, {}
+        return op_id, data if isinstance(data, dict) else {}
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.poll_workers, thread_name_prefix="poll") as pool:
+            while True:
+                with self._cond:
+                    while not self._closed and (not self._heap or self._heap[0][0] > time.monotonic()):
+                        self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        due.append(heapq.heappop(self._heap)[1])
+                    self.poll_requests += len(due)
+
+                with span("poll.batch", operations=len(due)):
+                    for op_id, data in pool.map(self._check, due):
+                        try:
+                            self._update(op_id, data)
+                        except Exception as e:
+                            self._fail(op_id, e)
+
+    def _update(self, op_id, data):
+        with self._cond:
+            op = self._ops.get(op_id)
+            if op is None:
+                return
+            now = time.monotonic()
+            op["polls"] += 1
+            if data.get("done"):
+                del self._ops[op_id]
+                asset_id = (data.get("response") or {}).get("assetId")
+                if not asset_id:
+                    print(f"[ERROR] Operation {op_id} failed: {data.get('error')}")
+            elif now >= op["deadline"]:
+                del self._ops[op_id]
+                asset_id = None
+                print(f"[ERROR] Operation {op_id} timed out")
+            else:
+                op["delay"] = min(self.max_delay, op["delay"] * self.backoff)
+                heapq.heappush(self._heap, (now + op["delay"], op_id))
+                return
+        # from POST to asset id, across all its polls
+        tracer.record("upload.operation", op["started"], time.perf_counter(), operation=op_id,
+                      polls=op["polls"], asset_id=asset_id)
+        op["future"].set_result(asset_id)
+
+    def _fail(self, op_id, error):
+        # only this operation's upload fails; the others keep being polled
+        with self._cond:
+            op = self._ops.pop(op_id, None)
+        if op is not None and not op["future"].done():
+            op["future"].set_exception(error)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            ops, self._ops = self._ops, {}
+            self._heap = []
+            self._cond.notify()
+        for op in ops.values():
+            op["future"].set_result(None)
 
 
 class Upload:
-    def __init__(self, api_key, creator_user_id):
+    def __init__(self, api_key, creator_user_id, transport=None, poller=None):
         self.api_key = api_key
         self.creator_user_id = creator_user_id
         self.headers = {"x-api-key": api_key}
+        self.transport = transport or Transport(api_key)
+        self.poller = poller or OperationPoller(self.transport)
         self.results = {}
 
     def _poll(self, op_id):
-        url = f"https://apis.roblox.com/assets/v1/operations/{op_id}"
+        return self.poller.submit(op_id).result()
 
-        while True:
-            data = requests.get(url, headers=self.headers).json()
+    def _track(self, name, op_id):
+        future = self.poller.submit(op_id)
 
-            if data.get("done"):
-                return data["response"]["assetId"]
+        def record(f):
+            if f.result():
+                self.results[name] = f.result()
+
+        future.add_done_callback(record)
+        return future
+
+    def resume(self, op_id, name=None):
+        """Future for the asset id of an operation posted earlier, e.g. by a
+        run that was interrupted."""
+        return self._track(name or op_id, op_id)
+
+    def uploadMesh(self, fbx_path, name=None):
+        return self.submitMesh(fbx_path, name).result()
 
-            time.sleep(0.05)
+    def uploadImage(self, resized_png_path, name=None):
+        return self.submitImage(resized_png_path, name).result()
 
-    def uploadMesh(self, fbx_path: str):
-        fbx_path = Path(fbx_path)
+    def submitMesh(self, fbx_path, name=None, on_operation=None):
+        """POST the mesh and return a Future for its asset id.
 
-        if not fbx_path.exists():
+        fbx_path is a path or the FBX itself as bytes/buffer/file object, in
+        which case name is the file name sent with it. on_operation is called
+        with the operation id as soon as the POST returned.
+        """
+        payload = _payload(fbx_path, name)
+        if payload is None:
             print(f"[ERROR] FBX not found: {fbx_path}")
-            return None
+            return _resolved(None)
+        file_name, data = payload
 
         request_payload = (
             None,
@@ -38,37 +431,39 @@ class Upload:
 
         files = {
             "request": request_payload,
-            "fileContent": (fbx_path.name, open(fbx_path, "rb"), "model/fbx"),
+            "fileContent": (file_name, data, "model/fbx"),
         }
 
-        resp = requests.post(
-            "https://apis.roblox.com/assets/v1/assets",
-            headers=self.headers,
-            files=files
-        ).json()
+        with span("upload.post", file=file_name, bytes=len(data), asset_type="Mesh"):
+            resp = _json(self.transport.post(
+                f"{self.transport.base_url}/assets/v1/assets",
+                files=files
+            ))
 
         print(resp)
 
         op = resp.get("operationId")
         if not op:
             print("[ERROR] Mesh upload failed: no operationId")
-            return None
+            return _resolved(None)
+        if on_operation:
+            on_operation(op)
 
-        asset_id = self._poll(op)
-        self.results[fbx_path.name] = asset_id
-        return asset_id
+        return self._track(file_name, op)
 
-    def uploadImage(self, resized_png_path: str):
-        image_path = Path(resized_png_path)
-
-        if not image_path.exists():
-            print(f"[ERROR] 512x texture not found: {image_path}")
-            return None
+    def submitImage(self, resized_png_path, name=None, on_operation=None):
+        """POST the image and return a Future for its asset id; takes a path
+        or bytes and on_operation like submitMesh."""
+        payload = _payload(resized_png_path, name)
+        if payload is None:
+            print(f"[ERROR] 512x texture not found: {resized_png_path}")
+            return _resolved(None)
+        file_name, data = payload
 
         request_json = (
             '{{'
             '"assetType": "Image", '
-            f'"displayName": "{image_path.stem}", '
+            f'"displayName": "{Path(file_name).stem}", '
             '"description": "512x texture", '
             '"creationContext": {{ "creator": {{ "userId": "{}" }} }}'
             '}}'
@@ -76,20 +471,29 @@ class Upload:
 
         files = {
             "request": (None, request_json, "application/json"),
-            "fileContent": (image_path.name, open(image_path, "rb"), "image/png"),
+            "fileContent": (file_name, data, "image/png"),
         }
 
-        resp = requests.post(
-            "https://apis.roblox.com/assets/v1/assets",
-            headers=self.headers,
-            files=files
-        ).json()
+        with span("upload.post", file=file_name, bytes=len(data), asset_type="Image"):
+            resp = _json(self.transport.post(
+                f"{self.transport.base_url}/assets/v1/assets",
+                files=files
+            ))
 
         op_id = resp.get("operationId")
         if not op_id:
             print("[ERROR] Image upload failed: no operationId")
-            return None
+            return _resolved(None)
+        if on_operation:
+            on_operation(op_id)
+
+        return self._track(file_name, op_id)
+
+    async def uploadMeshAsync(self, fbx_path, name=None):
+        return await asyncio.to_thread(self.uploadMesh, fbx_path, name)
+
+    async def uploadImageAsync(self, resized_png_path, name=None):
+        return await asyncio.to_thread(self.uploadImage, resized_png_path, name)
 
-        asset_id = self._poll(op_id)
-        self.results[image_path.name] = asset_id
-        return asset_id
+    def close(self):
+        self.poller.close()
@@ -0,0 +1,96 @@
+import argparse
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from batch import write_outputs
+from converter import TRACE_FILE, TRACE_PROFILE, Converter
+
+
+def snapshot(path):
+    # (name, mtime, size) of every file, to notice edits without reading them
+    path = Path(path)
+    if path.is_dir():
+        return {str(f.relative_to(path)): (f.stat().st_mtime_ns, f.stat().st_size)
+                for f in path.rglob("*") if f.is_file()}
+    st = path.stat()
+    return {path.name: (st.st_mtime_ns, st.st_size)}
+
+
+def pack_file(path, tmp):
+    """The pack to convert: a zip/mcpack as is, or a folder stored into a zip
+    (.mcpack when it has a Bedrock manifest.json)."""
+    path = Path(path)
+    if not path.is_dir():
+        return path
+    suffix = ".mcpack" if (path / "manifest.json").exists() else ".zip"
+    out = Path(tmp) / f"{path.name}{suffix}"
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as zf:
+        for f in sorted(path.rglob("*")):
+            if f.is_file():
+                zf.write(f, f.relative_to(path).as_posix())
+    return out
+
+
+def wait_for_change(path, last, interval):
+    # return once the files differ from last and have stopped changing
+    while True:
+        time.sleep(interval)
+        try:
+            current = snapshot(path)
+        except FileNotFoundError:
+            continue
+        if current == last:
+            continue
+        time.sleep(interval)
+        try:
+            settled = snapshot(path)
+        except FileNotFoundError:
+            continue
+        if settled == current:
+            return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a pack every time its files change")
+    parser.add_argument("pack", help="unpacked pack folder or .zip/.mcpack file")
+    parser.add_argument("-o", "--out", help="also write generated_items.json, compressed.txt and clay.json here")
+    parser.add_argument("--clay-dir", help="folder with clay textures if the pack has none")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changes")
+    parser.add_argument("--trace", default=TRACE_FILE, help="write a Chrome trace of the session to this file")
+    parser.add_argument("--profile", default=TRACE_PROFILE, metavar="SPAN",
+                        help="run every span with this name (e.g. createMesh) under cProfile")
+    args = parser.parse_args()
+
+    pack = Path(args.pack)
+    if not pack.exists():
+        raise SystemExit(f"{pack} does not exist")
+
+    converter = Converter(trace_file=args.trace, profile=args.profile)
+    previous = None
+    state = snapshot(pack)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            while True:
+                print(f"=== Building {pack.name}")
+                try:
+                    result = converter.convert(pack_file(pack, tmp), clay_folder=args.clay_dir, previous=previous)
+                except Exception as e:
+                    print(f"[ERROR] Build failed: {e!r}")
+                    converter.cleanup()
+                else:
+                    previous = result
+                    if args.out:
+                        write_outputs(Path(args.out), result)
+                    print(result["compressed"])
+                print(f"[OK] Watching {pack} for changes (Ctrl+C to stop)")
+                state = wait_for_change(pack, state, args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        converter.close()
+
+
+if __name__ == "__main__":
+    main()
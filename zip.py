@@ -1,7 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import zipfile
 import shutil
 
+from tracing import span
+
+# parent folders that hold the textures the game actually uses
+CANONICAL_DIRS = {"item", "items", "block", "blocks"}
+# folders of optional texture overrides that reuse vanilla file names
+OVERRIDE_DIRS = {"optifine", "mcpatcher", "ctm", "cit"}
+
+
+def _entry_path(filename):
+    # packs zipped on Windows can store backslashes, which zipfile only
+    # turns into "/" when it runs on Windows itself
+    return filename.replace("\\", "/")
+
+
+def _rank(filename):
+    # lower sorts first: vanilla item/block textures, then the minecraft
+    # namespace, then the shallowest path, then by name so ties are stable
+    parts = _entry_path(filename).lower().split("/")
+    canonical = len(parts) >= 3 and parts[-3] == "textures" and parts[-2] in CANONICAL_DIRS
+    return (
+        any(p in OVERRIDE_DIRS for p in parts[:-1]),
+        not canonical,
+        "minecraft" not in parts[:-1],
+        len(parts),
+        filename,
+    )
+
+
+class PackIndex:
+    """Index of a pack's entries by file name, read once from the zip's
+    central directory.
+
+    When the same name appears more than once (other namespaces, OptiFine/CTM
+    overrides), lookup() returns the textures/item or textures/block entry
+    in preference to the others, whatever their order in the archive.
+    """
+
+    def __init__(self, zip_path):
+        self.path = Path(zip_path)
+        with span("pack.index", pack=self.path.name) as sp:
+            self.zf = zipfile.ZipFile(self.path, "r")
+            candidates = {}
+            for info in self.zf.infolist():
+                if info.is_dir():
+                    continue
+                candidates.setdefault(_entry_path(info.filename).rsplit("/", 1)[-1], []).append(info)
+            self.entries = {name: min(infos, key=lambda i: _rank(i.filename)) for name, infos in candidates.items()}
+            self.duplicates = sum(len(infos) - 1 for infos in candidates.values())
+            sp.set(entries=len(self.entries), duplicates=self.duplicates)
+
+    @property
+    def names(self):
+        return self.entries.keys()
+
+    def lookup(self, name):
+        return self.entries.get(name)
+
+    def has_any(self, names):
+        return not self.entries.keys().isdisjoint(names)
+
+    def read(self, name):
+        info = self.entries.get(name)
+        return self.zf.read(info) if info else None
+
+    def extract(self, names, dest_folder, workers=8):
+        """Decompress the given names into dest_folder on a thread pool and
+        return the paths written. Names not in the pack are skipped."""
+        dest_folder = Path(dest_folder)
+        infos = [(name, self.entries[name]) for name in dict.fromkeys(names) if name in self.entries]
+
+        def extract_one(item):
+            # ZipFile serialises the raw reads; zlib runs outside the GIL
+            name, info = item
+            out_path = dest_folder / name
+            with span("pack.extract", file=name, bytes=info.file_size):
+                with self.zf.open(info, "r") as src, open(out_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            return out_path
+
+        if not infos:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(infos)))) as pool:
+            return list(pool.map(extract_one, infos))
+
+    def load(self, names, store, workers=8):
+        """Like extract(), but into an ArtifactStore instead of a folder."""
+        infos = [(name, self.entries[name]) for name in dict.fromkeys(names) if name in self.entries]
+
+        def load_one(item):
+            name, info = item
+            with span("pack.extract", file=name, bytes=info.file_size):
+                return store.put(name, self.zf.read(info))
+
+        if not infos:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(infos)))) as pool:
+            return list(pool.map(load_one, infos))
+
+    def close(self):
+        self.zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class Zip:
     def __init__(self, assets_folder: Path, exported_folder: Path):
@@ -10,24 +118,18 @@ class Zip:
         self.assets_folder.mkdir(exist_ok=True)
         self.exported_folder.mkdir(exist_ok=True)
 
-    def unzip_pack(self, zip_path: str, required_filenames: list[str]):
+    def unzip_pack(self, zip_path: str, required_filenames: list[str], index: PackIndex = None):
         zip_path = Path(zip_path)
         if not zip_path.exists():
             print(f"[ERROR] Zip not found: {zip_path}")
             return
 
-        required = set(required_filenames)
+        if index is None:
+            with PackIndex(zip_path) as index:
+                return self.unzip_pack(zip_path, required_filenames, index)
 
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            for info in zf.infolist():
-                if info.is_dir():
-                    continue
-                name = Path(info.filename).name
-                if name in required:
-                    out_path = self.assets_folder / name
-                    with zf.open(info, "r") as src, open(out_path, "wb") as dst:
-                        shutil.copyfileobj(src, dst)
-                    print(f"[OK] Extracted {name} -> {out_path}")
+        for out_path in index.extract(required_filenames, self.assets_folder):
+            print(f"[OK] Extracted {out_path.name} -> {out_path}")
 
     def cleanup(self):
         if self.assets_folder.exists():